@@ -0,0 +1,484 @@
+"""Computer players that choose moves on an engine.Board."""
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import engine
+import settings
+
+WIN_SCORE = 1 << 40
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget has run out."""
+
+
+def get_symmetries(grid_division: int) -> tuple[tuple[int, ...], ...]:
+    """Returns the 8 rotations and reflections of the board as bitboard index permutations."""
+    last = grid_division - 1
+    transforms = (
+        lambda x, y: (x, y),
+        lambda x, y: (y, last - x),
+        lambda x, y: (last - x, last - y),
+        lambda x, y: (last - y, x),
+        lambda x, y: (y, x),
+        lambda x, y: (last - x, y),
+        lambda x, y: (last - y, last - x),
+        lambda x, y: (x, last - y),
+    )
+    symmetries = []
+    for transform in transforms:
+        permutation = []
+        for index in range(grid_division**2):
+            x, y = transform(*engine.cell_indices(index, grid_division))
+            permutation.append(engine.cell_index(x, y, grid_division))
+        symmetries.append(tuple(permutation))
+    return tuple(symmetries)
+
+
+def get_neighbour_masks(grid_division: int, radius: int) -> tuple[int, ...]:
+    """Returns a bitmask of the grid slots within 'radius' of each grid slot."""
+    masks = []
+    for index in range(grid_division**2):
+        x, y = engine.cell_indices(index, grid_division)
+        mask = 0
+        for nx in range(max(0, x - radius), min(grid_division, x + radius + 1)):
+            for ny in range(max(0, y - radius), min(grid_division, y + radius + 1)):
+                mask |= 1 << engine.cell_index(nx, ny, grid_division)
+        masks.append(mask)
+    return tuple(masks)
+
+
+def get_empty_indices(board: engine.Board) -> list[int]:
+    """Returns the bitboard indexes of every empty grid slot."""
+    empty = board.full_mask & ~(board.cross | board.circle)
+    indices = []
+    while empty:
+        low_bit = empty & -empty
+        indices.append(low_bit.bit_length() - 1)
+        empty ^= low_bit
+    return indices
+
+
+def get_line_counts(board: engine.Board, sprite_type: str) -> tuple[list[int], list[int]]:
+    """Returns the per-line sprite counts of the given player and of the opponent."""
+    if sprite_type == engine.CROSS:
+        return board.cross_counts, board.circle_counts
+    return board.circle_counts, board.cross_counts
+
+
+def get_forced_move(board: engine.Board, moves: list[int]) -> int | None:
+    """Returns a move that wins the board, or else one that blocks the opponent from winning, if any."""
+    own_counts, other_counts = get_line_counts(board, board.get_turn())
+    for counts, blocking_counts in ((own_counts, other_counts), (other_counts, own_counts)):  # win, then block
+        for move in moves:
+            for line in board.cell_lines[move]:
+                if counts[line] == board.line_lengths[line] - 1 and not blocking_counts[line]:
+                    return move
+    return None
+
+
+def get_candidate_moves(board: engine.Board, neighbour_masks: tuple[int, ...], full_width_limit: int) -> list[int]:
+    """Returns the empty grid slots worth searching, only those next to a sprite on large boards."""
+    occupied = board.cross | board.circle
+    if board.grid_division <= full_width_limit or not occupied:
+        candidates = board.full_mask & ~occupied
+        if not occupied and board.grid_division > full_width_limit:  # open in the center
+            center = board.grid_division // 2
+            candidates = 1 << engine.cell_index(center, center, board.grid_division)
+    else:
+        candidates = 0
+        remaining = occupied
+        while remaining:
+            low_bit = remaining & -remaining
+            candidates |= neighbour_masks[low_bit.bit_length() - 1]
+            remaining ^= low_bit
+        candidates &= ~occupied
+    moves = []
+    while candidates:
+        low_bit = candidates & -candidates
+        moves.append(low_bit.bit_length() - 1)
+        candidates ^= low_bit
+    return moves
+
+
+class RandomPlayer:
+    """Player that picks a uniformly random empty grid slot."""
+
+    def __init__(self, sprite_type: str, seed: int | str | None = None) -> None:
+        self.sprite_type = sprite_type
+        self.rng = random.Random(seed)
+
+    def choose_move(self, board: engine.Board) -> int:
+        """Returns the bitboard index of a random empty grid slot."""
+        return self.rng.choice(get_empty_indices(board))
+
+
+class HeuristicPlayer:
+    """Player that wins or blocks a win when it can, otherwise extends or blocks the most lines."""
+
+    def __init__(self, sprite_type: str, seed: int | str | None = None) -> None:
+        self.sprite_type = sprite_type
+        self.rng = random.Random(seed)
+
+    def choose_move(self, board: engine.Board) -> int:
+        """Returns the bitboard index of the best empty grid slot, ties are broken randomly."""
+        moves = get_empty_indices(board)
+        if (forced_move := get_forced_move(board, moves)) is not None:
+            return forced_move
+
+        own_counts, other_counts = get_line_counts(board, board.get_turn())
+        best_value, best_moves = -1, []
+        for move in moves:
+            value = 0
+            for line in board.cell_lines[move]:
+                own, other = own_counts[line], other_counts[line]
+                if not other:
+                    value += 10**own
+                if not own:
+                    value += 10**other
+            if value > best_value:
+                best_value, best_moves = value, [move]
+            elif value == best_value:
+                best_moves.append(move)
+        return self.rng.choice(best_moves)
+
+
+class AlphaBetaPlayer:
+    """Negamax player with alpha-beta pruning and a transposition table.
+
+    The search deepens iteratively until 'max_depth' or the 'time_budget' in seconds is reached,
+    or until the optional stop event is set.
+    Positions are stored in the table under the smallest of their 8 symmetric bitboards, and the
+    least recently used entry is evicted once the table holds 'table_size' positions.
+    On boards larger than 'full_width_limit' only grid slots next to a sprite are searched.
+    """
+
+    full_width_limit = 4
+    neighbour_radius = 1
+
+    def __init__(self,
+                 sprite_type: str,
+                 max_depth: int | None = settings.AI_MAX_DEPTH,
+                 time_budget: float | None = settings.AI_TIME_BUDGET,
+                 table_size: int = settings.AI_TABLE_SIZE) -> None:
+        self.sprite_type = sprite_type
+        self.max_depth = max_depth
+        self.time_budget = time_budget
+        self.table_size = table_size
+        self.table = OrderedDict()
+        self.grid_division = None
+        self.symmetries = ()
+        self.inverse_symmetries = ()
+        self.neighbour_masks = ()
+        self.line_weights = ()
+        self.nodes = 0
+
+    def setup(self, board: engine.Board) -> None:
+        """Precomputes the symmetry and neighbour tables for the board size."""
+        if board.grid_division == self.grid_division:
+            return
+        self.grid_division = board.grid_division
+        self.symmetries = get_symmetries(board.grid_division)
+        self.inverse_symmetries = tuple(tuple(permutation.index(index) for index in range(len(permutation)))
+                                        for permutation in self.symmetries)
+        self.neighbour_masks = get_neighbour_masks(board.grid_division, self.neighbour_radius)
+        # heuristic value of a line with this many sprites of one player
+        self.line_weights = (0,) + tuple(10**count for count in range(max(board.line_lengths) + 1))
+        self.table.clear()
+
+    def choose_move(self, board: engine.Board, stop: threading.Event | None = None) -> int:
+        """Returns the bitboard index of the best move found for the side to move."""
+        self.setup(board)
+        moves = self.get_moves(board)
+        if not moves:
+            raise ValueError("There are no legal moves on the board.")
+        best_move = moves[0]
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        self.nodes = 0
+        max_depth = self.max_depth if self.max_depth is not None else self.grid_division**2 - board.move_count
+        for depth in range(1, max_depth + 1):
+            try:
+                score, move = self.search_root(board, depth, deadline, stop)
+            except SearchTimeout:
+                break
+            best_move = move
+            if abs(score) >= WIN_SCORE - self.grid_division**2:  # forced win or loss found
+                break
+        return best_move
+
+    def search_root(self,
+                    board: engine.Board,
+                    depth: int,
+                    deadline: float | None = None,
+                    stop: threading.Event | None = None) -> tuple[int, int]:
+        """Searches every root move to the given depth, returning the best score and move."""
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_score, best_move = alpha, None
+        sprite_type = board.get_turn()
+        for move in self.order_moves(board, self.get_moves(board), self.get_table_move(board)):
+            board.play(sprite_type, move)
+            try:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, deadline, stop)
+            finally:
+                board.undo(move)
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+        self.store(board, depth, best_score, EXACT, best_move)
+        return best_score, best_move
+
+    def negamax(self,
+                board: engine.Board,
+                depth: int,
+                alpha: int,
+                beta: int,
+                deadline: float | None = None,
+                stop: threading.Event | None = None) -> int:
+        """Returns the score of the board for the side to move, raising SearchTimeout past the deadline or stop."""
+        self.nodes += 1
+        if self.nodes & 255 == 0 and (deadline is not None and time.perf_counter() > deadline
+                                      or stop is not None and stop.is_set()):
+            raise SearchTimeout
+        if board.winner is not None:  # the previous move won
+            return -(WIN_SCORE - board.move_count)
+        if not board.is_winnable():
+            return 0
+        if depth <= 0:
+            return self.evaluate(board)
+
+        original_alpha = alpha
+        key, symmetry = self.get_key(board)
+        entry = self.table.get(key)
+        table_move = None
+        if entry is not None:
+            self.table.move_to_end(key)
+            entry_depth, entry_score, entry_flag, entry_move = entry
+            table_move = self.inverse_symmetries[symmetry][entry_move]
+            if entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_score
+                if entry_flag == LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                elif entry_flag == UPPER_BOUND:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+
+        best_score, best_move = -WIN_SCORE - 1, None
+        sprite_type = board.get_turn()
+        for move in self.order_moves(board, self.get_moves(board), table_move):
+            board.play(sprite_type, move)
+            try:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, deadline, stop)
+            finally:
+                board.undo(move)
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.store(board, depth, best_score, flag, best_move, key, symmetry)
+        return best_score
+
+    def get_moves(self, board: engine.Board) -> list[int]:
+        """Returns the bitboard indexes of the empty grid slots worth searching."""
+        return get_candidate_moves(board, self.neighbour_masks, self.full_width_limit)
+
+    def order_moves(self, board: engine.Board, moves: list[int], first_move: int | None) -> list[int]:
+        """Sorts the moves by how much they extend or block lines, the table move first."""
+        own_counts, other_counts = get_line_counts(board, board.get_turn())
+        line_weights = self.line_weights
+
+        def move_value(move: int) -> int:
+            if move == first_move:
+                return WIN_SCORE
+            value = 0
+            for line in board.cell_lines[move]:
+                own, other = own_counts[line], other_counts[line]
+                if not other:
+                    value += line_weights[own + 1]
+                if not own:
+                    value += line_weights[other]
+            return value
+
+        return sorted(moves, key=move_value, reverse=True)
+
+    def evaluate(self, board: engine.Board) -> int:
+        """Returns a heuristic score for the side to move from the lines each player can still complete."""
+        line_weights = self.line_weights
+        score = 0
+        for cross, circle in zip(board.cross_counts, board.circle_counts):
+            if not circle:
+                score += line_weights[cross]
+            elif not cross:
+                score -= line_weights[circle]
+        return score if board.get_turn() == engine.CROSS else -score
+
+    def get_key(self, board: engine.Board) -> tuple[tuple[int, int], int]:
+        """Returns the canonical table key of the board and the symmetry that produces it."""
+        best_key, best_symmetry = None, 0
+        for symmetry, permutation in enumerate(self.symmetries):
+            key = self.permute(board.cross, permutation), self.permute(board.circle, permutation)
+            if best_key is None or key < best_key:
+                best_key, best_symmetry = key, symmetry
+        return best_key, best_symmetry
+
+    @staticmethod
+    def permute(bitboard: int, permutation: tuple[int, ...]) -> int:
+        """Returns the bitboard with every bit moved to its index in the permutation."""
+        result = 0
+        while bitboard:
+            low_bit = bitboard & -bitboard
+            result |= 1 << permutation[low_bit.bit_length() - 1]
+            bitboard ^= low_bit
+        return result
+
+    def get_table_move(self, board: engine.Board) -> int | None:
+        """Returns the best move stored for the board, if any."""
+        key, symmetry = self.get_key(board)
+        entry = self.table.get(key)
+        if entry is None:
+            return None
+        return self.inverse_symmetries[symmetry][entry[3]]
+
+    def store(self,
+              board: engine.Board,
+              depth: int,
+              score: int,
+              flag: int,
+              move: int,
+              key: tuple[int, int] | None = None,
+              symmetry: int | None = None) -> None:
+        """Stores a search result, evicting the least recently used entry when the table is full."""
+        if key is None:
+            key, symmetry = self.get_key(board)
+        self.table[key] = depth, score, flag, self.symmetries[symmetry][move]
+        self.table.move_to_end(key)
+        if len(self.table) > self.table_size:
+            self.table.popitem(last=False)
+
+
+class SearchNode:
+    """Node of the Monte Carlo search tree, for the position after 'move' was played."""
+
+    __slots__ = ("move", "parent", "sprite_type", "children", "untried_moves", "score", "visits")
+
+    def __init__(self, move: int | None, parent: "SearchNode | None", sprite_type: str | None,
+                 untried_moves: list[int]) -> None:
+        self.move = move
+        self.parent = parent
+        self.sprite_type = sprite_type  # the player that played 'move'
+        self.children = []
+        self.untried_moves = untried_moves
+        self.score = 0.0  # 1 per win and 0.5 per tie of 'sprite_type' in the playouts through this node
+        self.visits = 0
+
+
+class MCTSPlayer:
+    """Monte Carlo Tree Search player that keeps searching until the 'time_budget' in seconds runs out.
+
+    Every iteration descends the tree by UCT, expands one move and plays a random game out from
+    it, so the answer improves the longer the search runs and the most visited move can be
+    returned whenever the budget, 'max_iterations' or the optional stop event ends the search.
+    Moves that win or block a win are played without searching. On boards larger than
+    'full_width_limit' only grid slots next to a sprite are added to the tree.
+    """
+
+    full_width_limit = 4
+    neighbour_radius = 1
+
+    def __init__(self,
+                 sprite_type: str,
+                 time_budget: float | None = settings.AI_TIME_BUDGET,
+                 max_iterations: int | None = None,
+                 exploration: float = settings.MCTS_EXPLORATION,
+                 seed: int | str | None = None) -> None:
+        if time_budget is None and max_iterations is None:
+            raise ValueError("The search needs a time budget or a maximum number of iterations.")
+        self.sprite_type = sprite_type
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.grid_division = None
+        self.neighbour_masks = ()
+        self.iterations = 0
+
+    def choose_move(self, board: engine.Board, stop: threading.Event | None = None) -> int:
+        """Returns the bitboard index of the most visited move once the search ends."""
+        if board.grid_division != self.grid_division:
+            self.grid_division = board.grid_division
+            self.neighbour_masks = get_neighbour_masks(board.grid_division, self.neighbour_radius)
+        moves = get_empty_indices(board)
+        if not moves:
+            raise ValueError("There are no legal moves on the board.")
+        if (forced_move := get_forced_move(board, moves)) is not None:
+            return forced_move
+
+        root = SearchNode(None, None, None, self.get_moves(board))
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        self.iterations = 0
+        while self.max_iterations is None or self.iterations < self.max_iterations:
+            if (deadline is not None and time.perf_counter() > deadline
+                    or stop is not None and stop.is_set()):
+                break
+            self.iterate(root, board.copy())
+            self.iterations += 1
+        if not root.children:
+            return root.untried_moves[0]
+        return max(root.children, key=lambda child: child.visits).move
+
+    def iterate(self, node: SearchNode, board: engine.Board) -> None:
+        """Runs one selection, expansion, playout and backpropagation on a copy of the root board."""
+        exploration = self.exploration
+        while not node.untried_moves and node.children:  # selection
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.score / child.visits
+                       + exploration * math.sqrt(log_visits / child.visits))
+            board.play(board.get_turn(), node.move)
+
+        if node.untried_moves and board.winner is None and board.is_winnable():  # expansion
+            move = node.untried_moves.pop(self.rng.randrange(len(node.untried_moves)))
+            sprite_type = board.get_turn()
+            board.play(sprite_type, move)
+            over = board.winner is not None or not board.is_winnable()
+            child = SearchNode(move, node, sprite_type, [] if over else self.get_moves(board))
+            node.children.append(child)
+            node = child
+
+        winner = self.play_out(board)
+        while node is not None:  # backpropagation
+            node.visits += 1
+            if winner is None:
+                node.score += 0.5
+            elif winner == node.sprite_type:
+                node.score += 1
+            node = node.parent
+
+    def play_out(self, board: engine.Board) -> str | None:
+        """Plays random moves until the game is over and returns the winner."""
+        if board.winner is not None or not board.is_winnable():
+            return board.winner
+        moves = get_empty_indices(board)
+        self.rng.shuffle(moves)
+        for move in moves:
+            board.play(board.get_turn(), move)
+            if board.winner is not None or not board.live_lines:
+                break
+        return board.winner
+
+    def get_moves(self, board: engine.Board) -> list[int]:
+        """Returns the bitboard indexes of the empty grid slots worth adding to the tree."""
+        return get_candidate_moves(board, self.neighbour_masks, self.full_width_limit)
@@ -0,0 +1,112 @@
+"""Process-wide cache of loaded, scaled and display converted image surfaces.
+
+Surfaces are keyed by (image path, scale) and shared between every sprite that
+uses them, so they must not be drawn on. Images can be preloaded in a background
+thread, they are then converted to the display format on their first use. Images
+are loaded and scaled outside the cache lock, which is only held to store them.
+"""
+import threading
+from typing import Iterable
+
+import pygame as pg
+
+_surfaces: dict[tuple[str, tuple[float, float]], pg.Surface] = {}
+_unconverted: set[tuple[str, tuple[float, float]]] = set()  # loaded before the display mode was set
+_cache_info = {"hits": 0, "misses": 0}
+_lock = threading.Lock()  # guards _surfaces and _unconverted against the preload thread
+
+
+def get_image(image_file_name: str, scale: tuple[int | float, int | float] = (1, 1)) -> pg.Surface:
+    """Returns the shared surface for the given image file scaled by the given factors."""
+    key = image_file_name, (scale[0], scale[1])
+    surface = _surfaces.get(key)
+    if surface is None:
+        _cache_info["misses"] += 1
+        surface = _load_image(key)
+    else:
+        _cache_info["hits"] += 1
+        if key in _unconverted and pg.display.get_surface() is not None:
+            surface = _convert(key, surface)
+    return surface
+
+
+def preload(images: Iterable[tuple[str, tuple[int | float, int | float]]]) -> None:
+    """Loads the given (image path, scale) pairs into the cache."""
+    for image_file_name, scale in images:
+        get_image(image_file_name, scale)
+
+
+def preload_in_background(images: Iterable[tuple[str, tuple[int | float, int | float]]]) -> threading.Thread:
+    """Loads the given (image path, scale) pairs into the cache in a daemon thread and returns the thread."""
+    keys = [(image_file_name, (scale[0], scale[1])) for image_file_name, scale in images]
+    thread = threading.Thread(target=_preload_unconverted, args=(keys,), name="asset preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def evict(image_file_name: str, scale: tuple[int | float, int | float] | None = None) -> None:
+    """Removes the given image from the cache, at every scale if no scale is given."""
+    with _lock:
+        if scale is not None:
+            keys = [(image_file_name, (scale[0], scale[1]))]
+        else:
+            keys = [key for key in _surfaces if key[0] == image_file_name]
+        for key in keys:
+            _surfaces.pop(key, None)
+            _unconverted.discard(key)
+
+
+def get_cache_info() -> dict[str, int]:
+    """Returns the hit and miss counters and the number of cached surfaces."""
+    return {"image_hits": _cache_info["hits"], "image_misses": _cache_info["misses"], "image_size": len(_surfaces)}
+
+
+def clear() -> None:
+    """Removes every image from the cache."""
+    with _lock:
+        _surfaces.clear()
+        _unconverted.clear()
+
+
+def _preload_unconverted(keys: list[tuple[str, tuple[float, float]]]) -> None:
+    """Loads and scales the surfaces for the given cache keys without converting them."""
+    for key in keys:
+        if key not in _surfaces:
+            _load_image(key, convert=False)
+
+
+def _load_image(key: tuple[str, tuple[float, float]], convert: bool = True) -> pg.Surface:
+    """Loads, scales and caches the surface for the given cache key."""
+    image_file_name, scale = key
+    if scale == (1, 1):
+        surface = pg.image.load(image_file_name)
+    else:
+        image = _surfaces.get((image_file_name, (1, 1)))
+        if image is None:
+            image = _load_image((image_file_name, (1, 1)), convert)
+        size = image.get_size()
+        surface = pg.transform.scale(image, (size[0] * scale[0], size[1] * scale[1]))
+    if not convert or pg.display.get_surface() is None:  # convert() needs a display mode
+        return _store(key, surface, converted=False)
+    return _convert(key, surface)
+
+
+def _convert(key: tuple[str, tuple[float, float]], surface: pg.Surface) -> pg.Surface:
+    """Converts the surface to the display pixel format and caches it."""
+    return _store(key, surface.convert_alpha(), converted=True)
+
+
+def _store(key: tuple[str, tuple[float, float]], surface: pg.Surface, converted: bool) -> pg.Surface:
+    """Caches the surface and returns it, or returns the cached surface if that one is at least as good.
+    An unconverted surface never replaces a cached one, so the preload thread can't undo a conversion.
+    """
+    with _lock:
+        cached = _surfaces.get(key)
+        if cached is not None and (not converted or key not in _unconverted):
+            return cached
+        _surfaces[key] = surface
+        if converted:
+            _unconverted.discard(key)
+        else:
+            _unconverted.add(key)
+        return surface
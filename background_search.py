@@ -0,0 +1,89 @@
+"""Runs computer players in a worker thread so the game loop keeps drawing while they think.
+
+The search plays on its own copy of the board and posts the chosen move back to the game loop
+as an AI_MOVE event. Cancelling a search sets its stop event, which ends the search early, and
+starts a new search id, so a move still posted by the cancelled search is ignored as stale.
+A new search waits for the cancelled one to stop, so a player only ever runs one search at a
+time and its tables are never shared between threads. A search that raises switches to the
+next fallback player, and once every player has failed no more searches are started.
+"""
+import sys
+import threading
+import traceback
+from typing import Sequence
+
+import pygame as pg
+
+import engine
+
+AI_MOVE = pg.event.custom_type()
+
+
+class BackgroundSearch:
+    """Worker thread runner for the move searches of one computer player."""
+
+    def __init__(self, player, fallbacks: Sequence = ()) -> None:
+        self.player = player
+        self.fallbacks = list(fallbacks)  # players to switch to, in order, when a search fails
+        self.failed = False  # set once the last player failed too
+        self.search_id = 0
+        self.stop = None  # stop event of the running search, None while not searching
+        self.thread = None
+
+    def start(self, board: engine.Board) -> None:
+        """Starts searching a move for a copy of the board, cancelling any running search."""
+        self.cancel()
+        if self.thread is not None:
+            self.thread.join()  # the cancelled search stops at its next stop event check
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.search, args=(board.copy(), self.stop, self.search_id),
+                                       name=f"{self.player.sprite_type} search", daemon=True)
+        self.thread.start()
+
+    def search(self, board: engine.Board, stop: threading.Event, search_id: int) -> None:
+        """Runs in the worker thread and posts the chosen move, unless the search was cancelled.
+        A failed search posts its error instead of a move.
+        """
+        move = error = None
+        try:
+            move = self.player.choose_move(board, stop)
+        except Exception as exception:
+            traceback.print_exc()
+            error = exception
+        if not stop.is_set():
+            pg.event.post(pg.event.Event(AI_MOVE, sprite_type=self.player.sprite_type, move=move, error=error,
+                                         search_id=search_id))
+
+    def is_searching(self) -> bool:
+        """Checks if a search was started and its move hasn't been taken yet."""
+        return self.stop is not None
+
+    def can_search(self) -> bool:
+        """Checks if a new search can be started, which is the case until every player has failed."""
+        return not self.failed and self.stop is None
+
+    def take_move(self, event: pg.event.Event) -> int | None:
+        """Returns the move of an AI_MOVE event from the current search, None if the event is stale or failed.
+        A failed search switches to the next fallback player, or marks the search as failed if there is none.
+        """
+        if self.stop is None or event.search_id != self.search_id:
+            return None
+        self.stop = None
+        self.search_id += 1
+        if event.error is not None:
+            failed_player = type(self.player).__name__
+            if self.fallbacks:
+                self.player = self.fallbacks.pop(0)
+                print(f"{failed_player} failed, searching {event.sprite_type} moves with "
+                      f"{type(self.player).__name__} instead.", file=sys.stderr)
+            else:
+                self.failed = True
+            return None
+        return event.move
+
+    def cancel(self) -> None:
+        """Stops the running search, its move will not be played."""
+        if self.stop is not None:
+            self.stop.set()
+            self.stop = None
+            self.search_id += 1
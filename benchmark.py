@@ -0,0 +1,194 @@
+"""Benchmarks for the rules, hit-testing, rendering and startup of the game.
+
+Rendering runs headless on SDL's dummy video driver. Results are written as JSON, and
+'compare' flags every benchmark that got slower than a saved baseline by more than the
+threshold, exiting with status 1 if there are any.
+
+Usage: python benchmark.py run --output benchmark.json
+       python benchmark.py compare baseline.json benchmark.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from typing import Callable
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame as pg  # noqa: E402
+
+import settings  # noqa: E402
+import utils  # noqa: E402
+from main import TicTacToe  # noqa: E402
+
+BOARD_SIZES = (3, 15, 19)
+REPEAT = 5
+
+
+def time_function(function: Callable[[], object], repeat: int = REPEAT) -> dict:
+    """Returns the best and median time per call in microseconds."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    timings = [elapsed / number * 1e6 for elapsed in timer.repeat(repeat=repeat, number=number)]
+    return {"best_us": round(min(timings), 3), "median_us": round(statistics.median(timings), 3), "calls": number}
+
+
+def create_game(grid_division: int) -> TicTacToe:
+    """Returns a game with a window opened on the dummy video driver."""
+    game = TicTacToe(board_size=(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT), grid_division=grid_division)
+    game.start()
+    return game
+
+
+def fill_half_board(game: TicTacToe) -> None:
+    """Plays turns on every other grid slot in the top half of the board without anyone winning."""
+    positions = [game.get_grid_center(ix, iy) for iy in range(game.grid_division // 2)
+                 for ix in range(0, game.grid_division, 2)]
+    for position in positions:
+        if game.play_turn(position) is None or game.game_over:
+            break
+
+
+def benchmark_rules(grid_division: int) -> dict:
+    """Times the rule and geometry functions on a half full board."""
+    game = create_game(grid_division)
+    fill_half_board(game)
+    slot_size = settings.SCREEN_WIDTH / grid_division
+    position = int(slot_size * (grid_division - 0.5)), int(slot_size * (grid_division - 0.5))
+    empty_index = game.board.full_mask.bit_length() - 1  # bottom right grid slot
+
+    def add_turn() -> None:
+        game.add_turn(game.get_turn(), position)
+        game.board.undo(empty_index)
+        game.move_indices.pop()
+
+    results = {
+        "get_winner": time_function(game.get_winner),
+        "is_winnable": time_function(game.is_winnable),
+        "is_full_board": time_function(game.is_full_board),
+        "add_turn": time_function(add_turn),
+        "get_grid_indices": time_function(lambda: game.get_grid_indices(position)),
+        "get_grid_coords": time_function(lambda: game.get_grid_coords(position)),
+        "section_of_number": time_function(lambda: utils.section_of_number(position[0], settings.SCREEN_WIDTH,
+                                                                           grid_division)),
+    }
+    return {f"{name}[{grid_division}]": result for name, result in results.items()}
+
+
+def benchmark_frames(grid_division: int) -> dict:
+    """Times one frame of the game loop body when idle, on mouse hover and on a click."""
+    game = create_game(grid_division)
+    mouse = [(0, 0)]
+    get_pos = pg.mouse.get_pos
+    pg.mouse.get_pos = lambda: mouse[0]  # the dummy video driver has no mouse
+    try:
+        hover_positions = [(10, 10), settings.RESET_TEXT_POSITION]
+        click_position = game.get_grid_center(0, 0)
+        reset_position = settings.RESET_TEXT_POSITION
+        hover_frame = [0]
+
+        def hover_frame_body() -> None:
+            hover_frame[0] += 1
+            mouse[0] = hover_positions[hover_frame[0] % 2]
+            game.run_frame([pg.event.Event(pg.MOUSEMOTION, pos=mouse[0], rel=(0, 0), buttons=(0, 0, 0))])
+
+        def click_frame_body() -> None:  # a turn followed by a reset
+            game.mouse = mouse[0] = click_position  # clicks are hit-tested against the previous frames mouse
+            game.run_frame([pg.event.Event(pg.MOUSEBUTTONDOWN, pos=click_position, button=1)])
+            game.mouse = mouse[0] = reset_position
+            game.run_frame([pg.event.Event(pg.MOUSEBUTTONDOWN, pos=reset_position, button=1)])
+
+        game.run_frame([])
+        results = {
+            "frame_idle": time_function(lambda: game.run_frame([])),
+            "frame_hover": time_function(hover_frame_body),
+            "frame_click_and_reset": time_function(click_frame_body),
+        }
+    finally:
+        pg.mouse.get_pos = get_pos
+    return {f"{name}[{grid_division}]": result for name, result in results.items()}
+
+
+def benchmark_startup(repeat: int = REPEAT) -> dict:
+    """Times fresh game processes from their first import until the first frame is on screen."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+                       PYGAME_HIDE_SUPPORT_PROMPT="1")
+    timings = {}
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, os.path.join(directory, "startup.py")],
+                                capture_output=True, text=True, check=True, cwd=directory, env=environment).stdout
+        for phase, milliseconds in json.loads(output[output.index("{"):]).items():
+            timings.setdefault(phase.removesuffix("_ms"), []).append(milliseconds * 1000)
+    return {("time_to_first_frame" if phase == "time_to_first_frame" else f"startup_{phase}"):
+            {"best_us": round(min(times), 3), "median_us": round(statistics.median(times), 3), "calls": 1}
+            for phase, times in timings.items()}
+
+
+def run(output_path: str) -> None:
+    """Runs every benchmark and writes the results to a JSON file."""
+    pg.init()
+    results = {}
+    for grid_division in BOARD_SIZES:
+        results.update(benchmark_rules(grid_division))
+        results.update(benchmark_frames(grid_division))
+    results.update(benchmark_startup())
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pg.version.ver,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(output_path, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    for name, result in results.items():
+        print(f"{name:<36} {result['best_us']:>12.2f} us")
+
+
+def compare(baseline_path: str, current_path: str, threshold: float) -> int:
+    """Prints the change of every benchmark and returns the number of regressions."""
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)["results"]
+    with open(current_path) as current_file:
+        current = json.load(current_file)["results"]
+    regressions = 0
+    for name, result in current.items():
+        if name not in baseline:
+            print(f"{name:<36} {'new':>10}")
+            continue
+        change = result["best_us"] / baseline[name]["best_us"] - 1
+        regressed = change > threshold
+        regressions += regressed
+        print(f"{name:<36} {change:>+10.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Tic Tac Toe rules, rendering and startup.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--output", default="benchmark.json")
+    compare_parser = subparsers.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown, 0.1 is 10%%")
+    args = parser.parse_args()
+
+    match args.command:
+        case "run":
+            run(args.output)
+        case "compare":
+            sys.exit(1 if compare(args.baseline, args.current, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
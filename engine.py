@@ -0,0 +1,239 @@
+"""Headless Tic Tac Toe rules engine.
+
+The board is packed into two integer bitboards, one for each player, where the
+bit for grid slot (x, y) is 'x * grid_division + y'. Win combinations are
+precomputed as bitmasks so a win check is a few AND operations per line.
+
+Each board also keeps per-line occupancy counters that are updated on every
+move, so the outcome is known right after a move by only looking at the lines
+through the played slot. A line is blocked once both players have a sprite in
+it. The board is a tie as soon as no open line can be completed any more,
+either because it is blocked or because the only player who can still use it
+has fewer moves left than the line has empty slots. The opponent can always
+play elsewhere meanwhile, so this finds every draw as soon as it is certain.
+"""
+import settings
+
+CROSS = "cross"
+CIRCLE = "circle"
+
+
+def cell_index(ix: int, iy: int, grid_division: int) -> int:
+    """Returns the bitboard index for the given grid x- and y-indexes."""
+    return ix * grid_division + iy
+
+
+def cell_indices(index: int, grid_division: int) -> tuple[int, int]:
+    """Returns the grid x- and y-indexes for the given bitboard index."""
+    return divmod(index, grid_division)
+
+
+def get_win_length(grid_division: int, win_length: int | None = None) -> int:
+    """Returns the given win length, by default the whole row up to settings.MAX_WIN_LENGTH."""
+    return win_length if win_length is not None else min(grid_division, settings.MAX_WIN_LENGTH)
+
+
+def generate_win_combinations(grid_division: int, win_length: int) -> list[list[tuple[int, int]]]:
+    """Returns every row, column and diagonal of 'win_length' grid indexes on a 'grid_division' sized board."""
+    if not 1 <= win_length <= grid_division:
+        raise ValueError(f"Win length must be between 1 and {grid_division}, got {win_length}.")
+    steps = range(win_length)
+    last_start = grid_division - win_length
+    combinations = []
+    for i in range(grid_division):  # Rows
+        for j in range(last_start + 1):
+            combinations.append([(i, j + step) for step in steps])
+    for j in range(grid_division):  # Columns
+        for i in range(last_start + 1):
+            combinations.append([(i + step, j) for step in steps])
+    for i in range(last_start + 1):  # Diagonals from top-left
+        for j in range(last_start + 1):
+            combinations.append([(i + step, j + step) for step in steps])
+    for i in range(last_start + 1):  # Diagonals from top-right
+        for j in range(win_length - 1, grid_division):
+            combinations.append([(i + step, j - step) for step in steps])
+    return combinations
+
+
+def get_win_masks(combinations: list[list[tuple[int, int]]], grid_division: int) -> tuple[int, ...]:
+    """Returns a bitmask for each combination of grid indexes."""
+    masks = []
+    for combination in combinations:
+        mask = 0
+        for ix, iy in combination:
+            mask |= 1 << cell_index(ix, iy, grid_division)
+        masks.append(mask)
+    return tuple(masks)
+
+
+class Board:
+    """Tic Tac Toe board state stored as one bitboard per player."""
+
+    __slots__ = ("grid_division", "win_masks", "full_mask", "line_lengths", "max_line_length", "cell_lines",
+                 "cross", "circle", "move_count", "cross_counts", "circle_counts", "live_lines", "winner",
+                 "winning_move_count", "powers", "position_index")
+
+    def __init__(self, grid_division: int, win_masks: tuple[int, ...]) -> None:
+        self.grid_division = grid_division
+        self.win_masks = win_masks
+        self.full_mask = (1 << grid_division**2) - 1
+        self.line_lengths = tuple(mask.bit_count() for mask in win_masks)
+        self.max_line_length = max(self.line_lengths, default=0)
+        cell_lines = [[] for _ in range(grid_division**2)]
+        for line, mask in enumerate(win_masks):
+            while mask:
+                low_bit = mask & -mask
+                cell_lines[low_bit.bit_length() - 1].append(line)
+                mask ^= low_bit
+        self.cell_lines = tuple(tuple(lines) for lines in cell_lines)
+        self.cross = 0
+        self.circle = 0
+        self.move_count = 0
+        self.cross_counts = [0] * len(win_masks)  # number of crosses in each line
+        self.circle_counts = [0] * len(win_masks)  # number of circles in each line
+        self.live_lines = len(win_masks)  # lines that aren't blocked, i.e. don't contain both players
+        self.winner = None
+        self.winning_move_count = 0  # move count of the move that won the board
+        self.powers = tuple(3**index for index in range(grid_division**2))
+        self.position_index = 0  # base-3 number with a digit per grid slot: 0 empty, 1 cross, 2 circle
+
+    def empty_copy(self) -> "Board":
+        """Returns an empty board that shares this board's precomputed line tables."""
+        board = Board.__new__(Board)
+        board.grid_division = self.grid_division
+        board.win_masks = self.win_masks
+        board.full_mask = self.full_mask
+        board.line_lengths = self.line_lengths
+        board.max_line_length = self.max_line_length
+        board.cell_lines = self.cell_lines
+        board.powers = self.powers
+        board.cross_counts = [0] * len(self.win_masks)
+        board.circle_counts = [0] * len(self.win_masks)
+        board.reset()
+        return board
+
+    def copy(self) -> "Board":
+        """Returns a copy of the board that can be played on without changing this board."""
+        board = self.empty_copy()
+        board.cross = self.cross
+        board.circle = self.circle
+        board.move_count = self.move_count
+        board.cross_counts[:] = self.cross_counts
+        board.circle_counts[:] = self.circle_counts
+        board.live_lines = self.live_lines
+        board.winner = self.winner
+        board.winning_move_count = self.winning_move_count
+        board.position_index = self.position_index
+        return board
+
+    def reset(self) -> None:
+        """Clears every grid slot."""
+        self.cross = 0
+        self.circle = 0
+        self.move_count = 0
+        for line in range(len(self.win_masks)):
+            self.cross_counts[line] = 0
+            self.circle_counts[line] = 0
+        self.live_lines = len(self.win_masks)
+        self.winner = None
+        self.winning_move_count = 0
+        self.position_index = 0
+
+    def get_turn(self) -> str:
+        """Returns the sprite type whose turn it is, cross begins."""
+        return CROSS if self.move_count % 2 == 0 else CIRCLE
+
+    def is_empty(self, index: int) -> bool:
+        """Checks if the grid slot at the given bitboard index is empty."""
+        return not (self.cross | self.circle) >> index & 1
+
+    def get(self, index: int) -> str | None:
+        """Returns the sprite type in the grid slot at the given bitboard index."""
+        if self.cross >> index & 1:
+            return CROSS
+        if self.circle >> index & 1:
+            return CIRCLE
+        return None
+
+    def play(self, sprite_type: str, index: int) -> None:
+        """Places the given sprite type in the grid slot at the given bitboard index."""
+        bit = 1 << index
+        if (self.cross | self.circle) & bit:
+            raise ValueError("Grid slot is already taken.")
+        match sprite_type:
+            case "cross":
+                self.cross |= bit
+                self.position_index += self.powers[index]
+                own_counts, other_counts = self.cross_counts, self.circle_counts
+            case "circle":
+                self.circle |= bit
+                self.position_index += 2 * self.powers[index]
+                own_counts, other_counts = self.circle_counts, self.cross_counts
+            case _:
+                raise ValueError(f"Unknown sprite type: {sprite_type!r}.")
+        self.move_count += 1
+        for line in self.cell_lines[index]:
+            count = own_counts[line] + 1
+            own_counts[line] = count
+            if count == 1 and other_counts[line]:  # first sprite of this player in an opponent line
+                self.live_lines -= 1
+            if count == self.line_lengths[line] and self.winner is None:
+                self.winner = sprite_type
+                self.winning_move_count = self.move_count
+
+    def undo(self, index: int) -> None:
+        """Removes the sprite in the grid slot at the given bitboard index."""
+        bit = 1 << index
+        if self.cross & bit:
+            self.cross ^= bit
+            self.position_index -= self.powers[index]
+            own_counts, other_counts = self.cross_counts, self.circle_counts
+        elif self.circle & bit:
+            self.circle ^= bit
+            self.position_index -= 2 * self.powers[index]
+            own_counts, other_counts = self.circle_counts, self.cross_counts
+        else:
+            raise ValueError("Grid slot is already empty.")
+        if self.winner is not None and self.winning_move_count == self.move_count:
+            self.winner = None
+        self.move_count -= 1
+        for line in self.cell_lines[index]:
+            count = own_counts[line] - 1
+            own_counts[line] = count
+            if count == 0 and other_counts[line]:  # last sprite of this player in an opponent line
+                self.live_lines += 1
+
+    def get_winner(self) -> str | None:
+        """Returns a winner if someone has won the board."""
+        return self.winner
+
+    def is_full(self) -> bool:
+        """Checks if every grid slot is taken."""
+        return self.cross | self.circle == self.full_mask
+
+    def is_winnable(self) -> bool:
+        """Checks if any combination can still be completed by one of the players.
+
+        Only scans the open lines once a player has fewer moves left than the longest line.
+        """
+        if not self.live_lines:
+            return False
+        empty = self.grid_division**2 - self.move_count
+        cross_moves, circle_moves = (empty + 1) // 2, empty // 2  # the side to move gets the extra move
+        if self.move_count % 2:
+            cross_moves, circle_moves = circle_moves, cross_moves
+        if min(cross_moves, circle_moves) >= self.max_line_length:
+            return True
+        cross_counts, circle_counts = self.cross_counts, self.circle_counts
+        for line, length in enumerate(self.line_lengths):
+            if not circle_counts[line] and length - cross_counts[line] <= cross_moves:
+                return True
+            if not cross_counts[line] and length - circle_counts[line] <= circle_moves:
+                return True
+        return False
+
+
+def create_board(grid_division: int, win_length: int | None = None) -> Board:
+    """Returns an empty board with the given size and win length, see get_win_length for the default."""
+    win_length = get_win_length(grid_division, win_length)
+    return Board(grid_division, get_win_masks(generate_win_combinations(grid_division, win_length), grid_division))
@@ -0,0 +1,44 @@
+"""Font registry and bounded cache of rendered text surfaces.
+
+Rendered surfaces are shared between callers, so they must not be drawn on.
+"""
+from functools import lru_cache
+
+import pygame as pg
+
+import settings
+
+
+@lru_cache(maxsize=None)
+def get_font(font_name: str, font_size: int) -> pg.font.Font:
+    """Returns the shared system font with the given name and size."""
+    return pg.font.SysFont(font_name, font_size)
+
+
+@lru_cache(maxsize=settings.TEXT_CACHE_SIZE)
+def get_text_surface(font_name: str,
+                     font_size: int,
+                     text: str,
+                     color: str,
+                     background: str | None = None) -> pg.Surface:
+    """Returns the shared antialiased surface for the given text, font and colors."""
+    return get_font(font_name, font_size).render(text, True, color, background)
+
+
+def get_cache_info() -> dict[str, int]:
+    """Returns the hit and miss counters of the font registry and the text cache."""
+    font_info = get_font.cache_info()
+    text_info = get_text_surface.cache_info()
+    return {
+        "font_hits": font_info.hits,
+        "font_misses": font_info.misses,
+        "text_hits": text_info.hits,
+        "text_misses": text_info.misses,
+        "text_size": text_info.currsize,
+    }
+
+
+def clear() -> None:
+    """Removes every font and rendered text surface from the caches."""
+    get_text_surface.cache_clear()
+    get_font.cache_clear()
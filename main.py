@@ -1,121 +1,161 @@
+import argparse
+import os
+import subprocess
 import sys
+import time
 
 import pygame as pg
 
+import assets
+import background_search
+import engine
 import settings
 import utils
-from tile import TileSprite
+from ai import AlphaBetaPlayer, MCTSPlayer
+from background_search import BackgroundSearch
+from perfect_play import PerfectPlayer, PerfectPlayTable
+from profiler import FrameProfiler, ProfilerOverlaySprite
+from records import MAX_GRID_DIVISION, GameRecorder
+from tile import SpriteRegistry
+from widgets import ResetButtonSprite, TextSprite
 
 
 class TicTacToe:
     """Class containing Tic Tac Toe game board and logic."""
 
-    def __init__(self, board_size: tuple[int, int], grid_division: int) -> None:
-        pg.init()
+    def __init__(self,
+                 board_size: tuple[int, int],
+                 grid_division: int,
+                 win_length: int | None = None,
+                 ai_players: dict[str, AlphaBetaPlayer | MCTSPlayer | PerfectPlayer] | None = None,
+                 ai_fallbacks: dict[str, list[AlphaBetaPlayer | MCTSPlayer]] | None = None,
+                 profiler: FrameProfiler | None = None,
+                 recorder: GameRecorder | None = None) -> None:
+        init_start = time.perf_counter()
+        pg.display.init()  # only the modules the game uses, pg.init() would also open the audio device
+        pg.font.init()
         self.window_size = board_size
         self.grid_division = grid_division
+        self.win_length = engine.get_win_length(grid_division, win_length)
+        self.win_combinations = engine.generate_win_combinations(grid_division, self.win_length)
+        self.mark_scale = board_size[0] / grid_division / settings.MARK_IMAGE_SLOT_SIZE
         self.grid_size = int(board_size[0] / grid_division), int(
                 (board_size[1] - settings.SCREEN_HEIGHT_OFFSET) / grid_division)
-        self.sprite_coords = []
-        self.sprite_types = []
-        self.sprite_group = pg.sprite.Group()
-        self.grid = [  # grid containing sprite type strings on the screen
-            [None, None, None],  # row 1
-            [None, None, None],  # row 2
-            [None, None, None]   # row 3
-        ]
+        self.move_indices = []  # bitboard index of every turn, in order
+        self.sprite_group = pg.sprite.LayeredDirty()
+        self.sprite_group.set_timing_threshold(float("inf"))  # always update dirty rects, never the full screen
+        self.sprites = SpriteRegistry(self.sprite_group)  # tile sprites by bitboard index and role
+        self.board = engine.create_board(grid_division, self.win_length)
+        self.ai_players = ai_players if ai_players is not None else {}  # computer players by sprite type
+        # computer players search in worker threads and post their moves as AI_MOVE events
+        # a computer player whose search fails is replaced by its fallback players in order
+        ai_fallbacks = ai_fallbacks if ai_fallbacks is not None else {}
+        self.searches = {sprite_type: BackgroundSearch(player, ai_fallbacks.get(sprite_type, ()))
+                         for sprite_type, player in self.ai_players.items()}
         self.game_over = False
+        self.screen = None  # set when the game window is opened in start()
+        self.text_label = "First turn:".center(settings.TEXT_WIDTH)
+        self.status_text = None
+        self.reset_button = None
+        self.mouse = 0, 0
+        self.profiler = profiler  # None disables the frame instrumentation
+        self.profiler_overlay = None
+        self.recorder = recorder  # None disables recording games
+        self.asset_loader = None  # thread loading the images that aren't in the first frame
+        self.start_time = None
+        self.startup_times = {"init": time.perf_counter() - init_start}  # seconds
+
+    @property
+    def grid(self) -> list[list[str | None]]:
+        """Returns the sprite type strings on the screen as a list of rows."""
+        return [[self.board.get(engine.cell_index(i, j, self.grid_division)) for j in range(self.grid_division)]
+                for i in range(self.grid_division)]
 
     def add_turn(self, sprite_type: str, grid_coords: tuple[int, int]) -> None:
         """Adds a turn to a certain grid slot."""
-        self.sprite_types.append(sprite_type)
-        self.sprite_coords.append(grid_coords)
         x, y = self.get_grid_indices(grid_coords)
-        # noinspection PyTypeChecker
-        self.grid[x][y] = sprite_type
+        index = engine.cell_index(x, y, self.grid_division)
+        self.board.play(sprite_type, index)
+        self.move_indices.append(index)
 
     def get_winner(self) -> str | None:
         """Returns a winner if someone has won the board."""
-        for combination in self.get_possible_win_combinations():
-            cross_count = 0
-            circle_count = 0
-            for i, row in enumerate(self.grid):
-                for j, elem in enumerate(row):
-                    if not (i, j) in combination:
-                        continue
-                    match elem:
-                        case "cross":
-                            cross_count += 1
-                            if cross_count >= 3:
-                                return "cross"
-                        case "circle":
-                            circle_count += 1
-                            if circle_count >= 3:
-                                return "circle"
-        return
-
-    def get_possible_win_combinations(self):
-        if self.grid_division != 3:
-            raise NotImplementedError("At the moment only 3x3 grid is supported.")
-        winning_combinations = [
-            [(0, 0), (0, 1), (0, 2)],  # Row 1
-            [(1, 0), (1, 1), (1, 2)],  # Row 2
-            [(2, 0), (2, 1), (2, 2)],  # Row 3
-            [(0, 0), (1, 0), (2, 0)],  # Column 1
-            [(0, 1), (1, 1), (2, 1)],  # Column 2
-            [(0, 2), (1, 2), (2, 2)],  # Column 3
-            [(0, 0), (1, 1), (2, 2)],  # Diagonal from top-left
-            [(0, 2), (1, 1), (2, 0)]  # Diagonal from top-right
-        ]
-        return winning_combinations
-
-    def get_all_grid_indices(self):
-        if self.grid_division != 3:
-            raise NotImplementedError("At the moment only 3x3 grid is supported.")
-        return [
-            (0, 0), (0, 1), (0, 2),  # Row 1
-            (1, 0), (1, 1), (1, 2),  # Row 2
-            (2, 0), (2, 1), (2, 2),  # Row 3
-        ]
+        return self.board.get_winner()
+
+    def get_turn(self) -> str:
+        """Returns the sprite type whose turn it is."""
+        return self.board.get_turn()
+
+    def play_turn(self, position: tuple[int, int]) -> tuple[pg.Surface, pg.Rect] | None:
+        """Adds whoevers turn it is to the grid slot at the given position.
+        Returns the new bottom text objects, or None if the grid slot can't be played.
+        """
+        match self.get_turn():
+            case "cross":
+                if self.add_cross_sprite_on_click(position):
+                    return None
+                self.set_turn_sprite("circle")  # Change the bottom image sprite to circle
+            case "circle":
+                if self.add_circle_sprite_on_click(position):
+                    return None
+                self.set_turn_sprite("cross")  # Change the bottom image sprite to cross
+        # Outcome only changes after a turn, so it is checked here instead of every frame
+        if self.profiler is not None:
+            rules_start = time.perf_counter()
+            game_over_text = self.get_game_over_text_objects()
+            self.profiler.add("rules", time.perf_counter() - rules_start)
+        else:
+            game_over_text = self.get_game_over_text_objects()
+        if game_over_text is not None:
+            return game_over_text
+        return utils.get_turn_text_objects("Next turn: ".center(settings.TEXT_WIDTH))
+
+    def get_game_over_text_objects(self) -> tuple[pg.Surface, pg.Rect] | None:
+        """Ends the game and returns the bottom text objects if the last turn won or tied the board."""
+        if self.game_over:
+            return None
+        if (winner := self.get_winner()) is not None:
+            self.game_over = True
+            self.record_game()
+            self.set_turn_sprite(winner)
+            return utils.get_winner_text_objects(winner)
+        if not self.is_winnable():  # no more legal moves
+            self.game_over = True
+            self.record_game()
+            self.set_turn_sprite(None)
+            return utils.get_tie_text_objects()
+        return None
+
+    def record_game(self) -> None:
+        """Appends the moves of the current game to the recorder, if there is one."""
+        if self.recorder is not None and self.move_indices:
+            self.recorder.record(self.board, self.win_length, self.move_indices)
+
+    def get_possible_win_combinations(self) -> list[list[tuple[int, int]]]:
+        """Returns every combination of grid indexes that wins the board."""
+        return self.win_combinations
+
+    def get_all_grid_indices(self) -> list[tuple[int, int]]:
+        """Returns the grid indexes of every grid slot, row by row."""
+        return [(i, j) for i in range(self.grid_division) for j in range(self.grid_division)]
 
     def is_winnable(self) -> bool:
         """Checks if there are no more legal moves."""
-        if self.is_full_board():
-            return False
-        for combination in self.get_possible_win_combinations():
-            cross_count = 0
-            circle_count = 0
-            for i, row in enumerate(self.grid):
-                for j, elem in enumerate(row):
-                    if not (i, j) in combination:
-                        continue
-                    match elem:
-                        case "cross" | None:
-                            cross_count += 1
-                            if cross_count >= 3:
-                                return True
-                        case "circle" | None:
-                            circle_count += 1
-                            if circle_count >= 3:
-                                return True
-        return False
+        return self.board.is_winnable()
 
     def is_full_board(self) -> bool:
         """Checks if the board is completely full of sprites."""
-        if len(self.sprite_types) >= self.grid_division**2:
-            return True
-        return False
+        return self.board.is_full()
 
     def reset(self) -> tuple[pg.Surface, pg.Rect]:
         """Resets the game board."""
-        self.sprite_coords = []
-        self.sprite_types = []
-        self.grid = [  # grid containing sprite type strings on the screen
-            [None, None, None],  # row 1
-            [None, None, None],  # row 2
-            [None, None, None]  # row 3
-        ]
-        self.sprite_group = pg.sprite.Group()
+        if not self.game_over:  # finished games are recorded when they end
+            self.record_game()
+        for search in self.searches.values():
+            search.cancel()
+        self.move_indices = []
+        self.board.reset()
+        self.sprites.clear_marks()
         self.set_turn_sprite("cross")
         self.game_over = False
         text_label = "First turn:".center(settings.TEXT_WIDTH)
@@ -123,9 +163,12 @@ class TicTacToe:
 
     def get_grid_coords(self, coordinates: tuple[int, int]) -> tuple[int, int]:
         """Returns the board coordinates for the grid center of the given position."""
-        grid_size = self.window_size[0]
-        ix, iy = self.get_grid_indices(coordinates)
-        return int(grid_size / 6 + ix * grid_size / 3), int(grid_size / 6 + iy * grid_size / 3)
+        return self.get_grid_center(*self.get_grid_indices(coordinates))
+
+    def get_grid_center(self, ix: int, iy: int) -> tuple[int, int]:
+        """Returns the board coordinates for the center of the grid slot with the given indexes."""
+        slot_size = self.window_size[0] / self.grid_division
+        return int(slot_size / 2 + ix * slot_size), int(slot_size / 2 + iy * slot_size)
 
     def get_grid_indices(self, coordinates: tuple[int, int]) -> tuple[int, int]:
         """Returns grid x- and y-indexes for whichever grid the given coordinates are in.
@@ -148,15 +191,12 @@ class TicTacToe:
                              image_name: str,
                              scale: tuple[int | float, int | float] = (1, 1),
                              anchor: str = "center") -> None:
-        """Adds a GameSprite object to the 'self.sprite_group' pg.sprite.Group."""
-        if sprite_type != "turn_sprite":  # this is a click on grid: a turn
-            self.add_turn(sprite_type, position)
-        # noinspection PyTypeChecker
-        self.sprite_group.add(TileSprite(sprite_type=sprite_type,
-                                         image_file_name=image_name,
-                                         position=position,
-                                         scale=scale,
-                                         anchor=anchor))
+        """Shows a tile sprite, the turn sprite or a mark in the grid slot at the position."""
+        if sprite_type == "turn_sprite":
+            self.sprites.show_turn_indicator(sprite_type, image_name, position, scale, anchor)
+            return
+        self.add_turn(sprite_type, position)  # this is a click on grid: a turn
+        self.sprites.place_mark(self.move_indices[-1], sprite_type, image_name, position, scale, anchor)
 
     def add_sprite_on_click(self,
                             position: tuple[int, int],
@@ -168,12 +208,12 @@ class TicTacToe:
          if its inside the grid and the grid slot is empty.
          """
         try:
-            position = self.get_grid_coords(position)
-            if position in self.sprite_coords:  # grid position is taken
+            ix, iy = self.get_grid_indices(position)
+            if self.sprites.has_mark(engine.cell_index(ix, iy, self.grid_division)):  # grid position is taken
                 return 1
             self.add_sprite_to_screen(sprite_type=sprite_type,
                                       image_name=image_name,
-                                      position=position,
+                                      position=self.get_grid_center(ix, iy),
                                       scale=scale,
                                       anchor=anchor)
             return 0
@@ -186,7 +226,7 @@ class TicTacToe:
         """
         sprite_type = "cross"
         image_name = settings.CROSS_IMAGE
-        return self.add_sprite_on_click(position, sprite_type, image_name)
+        return self.add_sprite_on_click(position, sprite_type, image_name, scale=(self.mark_scale, self.mark_scale))
 
     def add_circle_sprite_on_click(self, position: tuple[int, int]) -> int:
         """Adds a circle sprite to the 'all_sprites' pg.sprite.Group
@@ -194,23 +234,14 @@ class TicTacToe:
          """
         sprite_type = "circle"
         image_name = settings.CIRCLE_IMAGE
-        return self.add_sprite_on_click(position, sprite_type, image_name)
+        return self.add_sprite_on_click(position, sprite_type, image_name, scale=(self.mark_scale, self.mark_scale))
 
     def remove_previous_turn_sprite(self):
-        """Removes the previous turn GameSprite from the self.sprite_* lists and the 'all_sprites' pg.sprite.Group."""
-        if not bool(self.sprite_types):  # no sprites
-            return
-        for key, value in self.sprite_group.spritedict.items():
-            if value is None:
-                continue
-            if value.size == (45, 45):
-                del self.sprite_group.spritedict[key]
-                return
+        """Hides the turn sprite at the bottom of the window."""
+        self.sprites.hide_turn_indicator()  # LayeredDirty clears its old area on the next draw
 
     def set_turn_sprite(self, sprite_type: str | None) -> None:
         """Changes the bottom sprite image to whoevers turn it is."""
-        if len(game.sprite_types):  # not first sprite
-            self.remove_previous_turn_sprite()
         match sprite_type:
             case "cross":
                 self.add_sprite_to_screen(settings.BOTTOM_SPRITE_POSITION, "turn_sprite", settings.CROSS_IMAGE,
@@ -221,102 +252,203 @@ class TicTacToe:
             case _:
                 self.remove_previous_turn_sprite()
 
-    def run(self):
-        """Runs the Tic Tac Toe game loop."""
+    def get_sprite_images(self) -> list[tuple[str, tuple[float, float]]]:
+        """Returns the (image path, scale) pairs of every sprite the game can show."""
+        mark_scale = self.mark_scale, self.mark_scale
+        bottom_scale = settings.BOTTOM_SPRITE_SCALE, settings.BOTTOM_SPRITE_SCALE
+        return [(settings.CROSS_IMAGE, mark_scale), (settings.CIRCLE_IMAGE, mark_scale),
+                (settings.CROSS_IMAGE, bottom_scale), (settings.CIRCLE_IMAGE, bottom_scale)]
+
+    def get_background_image(self) -> pg.Surface:
+        """Returns the grid background, drawing the grid lines when the board is not 3x3."""
+        return utils.get_grid_background(self.window_size[0], self.grid_division)
+
+    def get_window_background(self) -> pg.Surface:
+        """Returns the full window background that sprites are cleared with."""
+        background = pg.Surface(self.window_size).convert()
+        background.fill(settings.WINDOW_BG_COLOR)
+        background.blit(self.get_background_image(), (0, 0))
+        return background
+
+    def start(self) -> pg.Surface:
+        """Opens the game window and draws the first frame.
+        Images that aren't in the first frame are loaded afterwards in a background thread.
+        """
         # initialize window scren
-        screen = pg.display.set_mode(self.window_size)
-
-        # Background, icon,and title
-        background_image = pg.image.load(settings.BACKGROUND_IMAGE)
+        self.start_time = time.perf_counter()
         pg.display.set_caption(settings.WINDOW_TITLE)
-        pg.display.set_icon(pg.image.load(settings.ICON_IMAGE))
+        self.screen = pg.display.set_mode(self.window_size)
+
+        # Background
+        background = self.get_window_background()
 
         # Bottom text saying whose turn it is
-        text_label = "First turn:".center(settings.TEXT_WIDTH)
-        text_surface, text_rect = utils.get_turn_text_objects(text_label)
+        self.text_label = "First turn:".center(settings.TEXT_WIDTH)
+        self.status_text = TextSprite(*utils.get_turn_text_objects(self.text_label))
+        self.reset_button = ResetButtonSprite()
+        self.sprite_group.add(self.status_text, self.reset_button)
+        if self.profiler is not None:
+            self.profiler_overlay = ProfilerOverlaySprite(self.profiler)
+            self.sprite_group.add(self.profiler_overlay)
 
         # Bottom image showing whose turn it is, cross begins
         self.set_turn_sprite("cross")
 
-        mouse = pg.mouse.get_pos()
+        self.sprite_group.clear(self.screen, background)
+        self.screen.blit(background, (0, 0))
+        self.sprite_group.draw(self.screen)
+        pg.display.update()
+        self.startup_times["first_frame"] = time.perf_counter() - self.start_time
+
+        # Window icon and the mark images, which aren't needed until the first turn
+        pg.display.set_icon(pg.image.load(settings.ICON_IMAGE))
+        self.asset_loader = assets.preload_in_background(self.get_sprite_images())
+        self.mouse = pg.mouse.get_pos()
+        return self.screen
+
+    def get_startup_report(self) -> dict[str, float]:
+        """Waits for the background images and returns the startup times in milliseconds.
+        Call right after start(), 'assets_ready' is measured from the start of start() until now.
+        """
+        self.asset_loader.join()
+        times = {**self.startup_times, "assets_ready": time.perf_counter() - self.start_time}
+        return {f"{phase}_ms": round(seconds * 1000, 3) for phase, seconds in times.items()}
+
+    def run_frame(self, events: list[pg.event.Event]) -> list[pg.Rect]:
+        """Handles the events of one frame and redraws what changed.
+        Returns the updated rectangles of the window, empty if nothing changed.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_frame()
+        text_surface, text_rect = self.status_text.image, self.status_text.rect
+        for event in events:
+            match event.type:
+                case pg.QUIT:
+                    for search in self.searches.values():
+                        search.cancel()
+                    if profiler is not None:
+                        profiler.dump(settings.PROFILER_DUMP_PATH)
+                    if self.recorder is not None:
+                        if not self.game_over:
+                            self.record_game()
+                        self.recorder.close()
+                    sys.exit()
+
+                case background_search.AI_MOVE:
+                    search = self.searches[event.sprite_type]
+                    move = search.take_move(event)
+                    if search.failed:  # every player failed, the side is played by hand from now on
+                        del self.searches[event.sprite_type], self.ai_players[event.sprite_type]
+                        print(f"The {event.sprite_type} computer player failed: {event.error!r}. "
+                              f"Play {event.sprite_type} by hand.", file=sys.stderr)
+                    if move is not None and not self.game_over and self.get_turn() == event.sprite_type:
+                        ix, iy = engine.cell_indices(move, self.grid_division)
+                        if (turn_text := self.play_turn(self.get_grid_center(ix, iy))) is not None:
+                            self.text_label = "Next turn: ".center(settings.TEXT_WIDTH)
+                            text_surface, text_rect = turn_text
+
+                case pg.KEYDOWN if profiler is not None:
+                    if event.key == pg.key.key_code(settings.PROFILER_OVERLAY_KEY):
+                        self.profiler_overlay.toggle()
+
+                case pg.MOUSEBUTTONDOWN:
+                    # Hit-test where the click happened, the saved position may be older than this batch of events
+                    mouse = event.pos
+                    # Click within grid, on a human players turn:
+                    if 0 <= mouse[0] <= settings.SCREEN_WIDTH and 0 <= mouse[1] <= settings.SCREEN_WIDTH:
+                        if not self.game_over and self.get_turn() not in self.ai_players:
+                            if (turn_text := self.play_turn(event.pos)) is not None:
+                                self.text_label = "Next turn: ".center(settings.TEXT_WIDTH)
+                                text_surface, text_rect = turn_text
+                        continue
+
+                    # Click within reset button:
+                    if utils.is_on_reset_button(mouse):
+                        text_surface, text_rect = self.reset()
+
+        if profiler is not None:
+            profiler.mark("events")
+
+        # Computer players turn, its move arrives as an AI_MOVE event when the search is done:
+        if not self.game_over and (search := self.searches.get(self.get_turn())) is not None \
+                and search.can_search():
+            search.start(self.board)
+        if profiler is not None:
+            profiler.mark("ai")
+
+        self.mouse = pg.mouse.get_pos()  # save mouse position for the reset button hover
+
+        # Show reset button if its not already reset, lighter while the mouse is hovering within it
+        self.status_text.set_text_objects(text_surface, text_rect)
+        self.reset_button.set_shown(self.text_label != "First turn:".center(settings.TEXT_WIDTH))
+        self.reset_button.set_hovered(utils.is_on_reset_button(self.mouse))
+        if profiler is not None:
+            self.profiler_overlay.refresh()
+            profiler.mark("text")
+
+        # Draw changed sprites and update only their areas of the window
+        dirty_rects = self.sprite_group.draw(self.screen)
+        if profiler is not None:
+            profiler.mark("sprites")
+        if dirty_rects:
+            pg.display.update(dirty_rects)
+        if profiler is not None:
+            profiler.mark("display")
+            profiler.end_frame()
+        return dirty_rects
+
+    def run(self, fps: int = settings.FPS):
+        """Runs the Tic Tac Toe game loop.
+
+        Only the dirty rectangles of changed sprites are redrawn, at most 'fps' times per second.
+        When a frame has nothing to redraw the loop blocks until the next event instead of polling.
+        """
+        self.start()
+        clock = pg.time.Clock()
+        idle = False
         while True:
-            screen.fill(settings.WINDOW_BG_COLOR)
-            screen.blit(background_image, (0, 0))
-            screen.blit(text_surface, text_rect)
-            for event in pg.event.get():
-                match event.type:
-                    case pg.QUIT:
-                        sys.exit()
-
-                    case pg.MOUSEBUTTONDOWN:
-                        # Click within grid:
-                        if 0 <= mouse[0] <= settings.SCREEN_WIDTH and 0 <= mouse[1] <= settings.SCREEN_WIDTH:
-                            # First click:
-                            if len(self.sprite_types) < 1:
-                                self.add_cross_sprite_on_click(event.pos)
-                                # Replace bottom text:
-                                text_label = "Next turn: ".center(settings.TEXT_WIDTH)
-                                text_surface, text_rect = utils.get_turn_text_objects(text_label)
-                                self.set_turn_sprite("circle")
-                                continue
-
-                            # Not first click:
-                            if self.game_over:
-                                continue
-                            sprite_type = self.sprite_types[-1]  # previous added sprite
-                            if sprite_type == "turn_sprite":
-                                sprite_type = self.sprite_types[-2]
-                            match sprite_type:
-                                case "cross":
-                                    if not bool(
-                                            self.add_circle_sprite_on_click(event.pos)):  # try adding circle sprite
-                                        self.set_turn_sprite("cross")  # Change the bottom image sprite to circle
-
-                                case "circle":
-                                    if not bool(
-                                            self.add_cross_sprite_on_click(event.pos)):  # try adding cross sprite
-                                        self.set_turn_sprite("circle")  # Change the bottom image sprite to cross
-
-                        # Click within reset button:
-                        reset_left_position = settings.RESET_TEXT_POSITION[0]
-                        reset_right_position = reset_left_position + settings.RESET_BUTTON_SIZE[0]
-                        reset_top_position = settings.RESET_TEXT_POSITION[1]
-                        reset_bottom_position = reset_top_position + settings.RESET_BUTTON_SIZE[1]
-                        if reset_left_position <= mouse[0] <= reset_right_position and \
-                                reset_top_position <= mouse[1] <= reset_bottom_position:
-                            text_surface, text_rect = self.reset()
-
-            if (winner := self.get_winner()) is not None:
-                self.game_over = True
-                text_surface, text_rect = utils.get_winner_text_objects(winner)
-                self.set_turn_sprite(winner)
-            elif not self.is_winnable() or self.is_full_board():  # no more legal moves
-                self.game_over = True
-                text_surface, text_rect = utils.get_tie_text_objects()
-                self.set_turn_sprite(None)
-
-            mouse = pg.mouse.get_pos()  # save mouse position for checking where next click is
-
-            # Render reset text if its not already reset
-            if text_label != "First turn:".center(settings.TEXT_WIDTH):
-                # If mouse is hovering within button, make it a lighter color
-                reset_left_position = settings.RESET_TEXT_POSITION[0]
-                reset_right_position = reset_left_position + settings.RESET_BUTTON_SIZE[0]
-                reset_top_position = settings.RESET_TEXT_POSITION[1]
-                reset_bottom_position = reset_top_position + settings.RESET_BUTTON_SIZE[1]
-                if reset_left_position <= mouse[0] <= reset_right_position and \
-                        reset_top_position <= mouse[1] <= reset_bottom_position:
-                    pg.draw.rect(screen, settings.RESET_BUTTON_BG_COLOR_LIGHTER, settings.RESET_BUTTON_POSITION)
-                else:
-                    pg.draw.rect(screen, settings.RESET_BUTTON_BG_COLOR, settings.RESET_BUTTON_POSITION)
-                reset_text_surface, reset_text_rect = utils.get_reset_text_objects()
-                screen.blit(reset_text_surface, settings.RESET_TEXT_POSITION)
-
-            # Draw sprites and update the window
-            self.sprite_group.draw(screen)
-            pg.display.update()
+            # Block until something happens if the previous frame had nothing to redraw
+            events = [pg.event.wait()] + pg.event.get() if idle else pg.event.get()
+            idle = not self.run_frame(events)
+            clock.tick(fps)
+
+
+def create_game() -> TicTacToe:
+    """Returns a game set up from settings.py, with its computer player and recorder."""
+    players = fallbacks = None
+    if settings.AI_SIDE is not None:
+        # Search players in the order of preference, each one the fallback of the one before
+        search_players = [AlphaBetaPlayer(settings.AI_SIDE), MCTSPlayer(settings.AI_SIDE)]
+        if settings.AI_PLAYER == "mcts":
+            search_players.reverse()
+        # Look perfect moves up in a precomputed table when there is one for the board size and win length
+        table_path = settings.get_perfect_play_table_path(settings.GRID_DIVISION)
+        table = PerfectPlayTable(table_path) if os.path.exists(table_path) else None
+        if table is not None and table.win_length != engine.get_win_length(settings.GRID_DIVISION):
+            table.close()
+            table = None
+        if table is not None:
+            search_players.insert(0, PerfectPlayer(settings.AI_SIDE, table))
+        players = {settings.AI_SIDE: search_players[0]}
+        fallbacks = {settings.AI_SIDE: search_players[1:]}
+    recorder = None
+    if settings.RECORD_PATH is not None and settings.GRID_DIVISION <= MAX_GRID_DIVISION:
+        recorder = GameRecorder(settings.RECORD_PATH)
+    return TicTacToe(board_size=(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT), grid_division=settings.GRID_DIVISION,
+                     ai_players=players, ai_fallbacks=fallbacks,
+                     profiler=FrameProfiler() if settings.PROFILER_ENABLED else None, recorder=recorder)
 
 
 if __name__ == "__main__":
-    game = TicTacToe(board_size=(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT), grid_division=3)
-    game.run()
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe.")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print the import, init, first frame and background image times of a fresh game "
+                             "process after its first frame and exit, see startup.py")
+    args = parser.parse_args()
+
+    if args.startup_report:
+        # This process has already imported everything, the report comes from a fresh one
+        sys.exit(subprocess.call([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                               "startup.py")]))
+    create_game().run()
@@ -0,0 +1,144 @@
+"""Precomputed perfect-play table for small boards, stored in a binary file that is read with mmap.
+
+Every position reachable from the empty board is solved offline and stored as one byte at
+its engine.Board.position_index, the base-3 number with a digit per grid slot (0 empty,
+1 cross, 2 circle) in the same grid[x][y] order TicTacToe uses. The top 2 bits of the byte
+hold the game value for the side to move and the low 6 bits the best move's bitboard index.
+Unreachable positions are 0. Positions that are already won or tied hold NO_MOVE.
+
+File layout: 8 byte header (magic, version, grid_division, win_length) followed by
+3**(grid_division**2) entry bytes. The 3x3 table is 19,691 bytes and is generated instantly,
+4x4 is about 43 MB and takes a few minutes.
+
+Usage: python perfect_play.py --grid-division 3 --output data/perfect_play_3x3.bin
+"""
+import argparse
+import mmap
+import struct
+import sys
+import threading
+import time
+
+import engine
+import settings
+
+MAGIC = b"TTTP"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBx")
+LOSS, TIE, WIN = 1, 2, 3  # game value for the side to move
+NO_MOVE = 63
+
+
+def solve(board: engine.Board, table: bytearray, plies: bytearray) -> None:
+    """Solves every position reachable from the board, writing its entry into the table.
+
+    Wins are played as fast as possible and losses delayed as long as possible, 'plies' holds the
+    number of moves left until the game ends with perfect play.
+    """
+    offset = HEADER.size
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), board.grid_division**2 * 4 + 100))
+
+    def solve_position() -> None:
+        index = board.position_index
+        if table[offset + index]:
+            return
+        if board.winner is not None:  # the previous move won
+            table[offset + index] = LOSS << 6 | NO_MOVE
+            return
+        if not board.is_winnable():
+            table[offset + index] = TIE << 6 | NO_MOVE
+            return
+
+        sprite_type = board.get_turn()
+        best_rank, best_value, best_move, best_plies = None, LOSS, NO_MOVE, 0
+        for move in range(board.grid_division**2):
+            if not board.is_empty(move):
+                continue
+            board.play(sprite_type, move)
+            solve_position()
+            child_index = board.position_index
+            board.undo(move)
+            value = WIN + LOSS - (table[offset + child_index] >> 6)  # the child value is for the opponent
+            move_plies = plies[child_index] + 1
+            rank = value, -move_plies if value == WIN else move_plies
+            if best_rank is None or rank > best_rank:
+                best_rank, best_value, best_move, best_plies = rank, value, move, move_plies
+        table[offset + index] = best_value << 6 | best_move
+        plies[index] = best_plies
+
+    solve_position()
+
+
+def generate(grid_division: int, win_length: int, output_path: str) -> None:
+    """Solves every reachable position of the board and writes the table file."""
+    if grid_division**2 > NO_MOVE:
+        raise ValueError(f"Perfect-play tables only support up to {NO_MOVE} grid slots.")
+    positions = 3**(grid_division**2)
+    table = bytearray(HEADER.size + positions)
+    HEADER.pack_into(table, 0, MAGIC, VERSION, grid_division, win_length)
+    solve(engine.create_board(grid_division, win_length), table, bytearray(positions))
+    with open(output_path, "wb") as table_file:
+        table_file.write(table)
+
+
+class PerfectPlayTable:
+    """Read-only, memory-mapped perfect-play table."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as table_file:
+            self.mmap = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.grid_division, self.win_length = HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} perfect-play table.")
+        if len(self.mmap) != HEADER.size + 3**(self.grid_division**2):
+            self.mmap.close()
+            raise ValueError(f"{path} is truncated.")
+
+    def lookup(self, board: engine.Board) -> tuple[int, int | None]:
+        """Returns the game value for the side to move and the best move, None if the game is over."""
+        if board.grid_division != self.grid_division or board.line_lengths[0] != self.win_length:
+            raise ValueError(f"The table is for a {self.grid_division}x{self.grid_division} board "
+                             f"won by {self.win_length} in a row.")
+        entry = self.mmap[HEADER.size + board.position_index]
+        if not entry:
+            raise KeyError("The position can't be reached with legal play.")
+        move = entry & NO_MOVE
+        return entry >> 6, None if move == NO_MOVE else move
+
+    def close(self) -> None:
+        """Unmaps the table file."""
+        self.mmap.close()
+
+
+class PerfectPlayer:
+    """Player that looks up the perfect move in a precomputed table."""
+
+    def __init__(self, sprite_type: str, table: PerfectPlayTable) -> None:
+        self.sprite_type = sprite_type
+        self.table = table
+
+    def choose_move(self, board: engine.Board, stop: threading.Event | None = None) -> int:
+        """Returns the bitboard index of the perfect move, a lookup is instant so 'stop' is ignored."""
+        _, move = self.table.lookup(board)
+        if move is None:
+            raise ValueError("The game is already over.")
+        return move
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Solve every reachable Tic Tac Toe position into a table file.")
+    parser.add_argument("--grid-division", type=int, default=settings.GRID_DIVISION)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    win_length = engine.get_win_length(args.grid_division, args.win_length)
+    output_path = args.output or settings.get_perfect_play_table_path(args.grid_division)
+    start = time.perf_counter()
+    generate(args.grid_division, win_length, output_path)
+    print(f"Wrote {output_path} in {time.perf_counter() - start:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Opt-in per-frame instrumentation of the game loop with an on-screen overlay.
+
+FrameProfiler keeps the last 'capacity' frames in preallocated arrays used as a ring buffer.
+The game loop charges the time since the previous mark() to each phase in turn, 'rules' is
+timed on its own with add() and is also part of the phase it happened in. When the game has
+no profiler the loop only pays for a few 'is None' checks per frame.
+"""
+import csv
+import json
+import time
+from array import array
+
+import pygame as pg
+
+import assets
+import fonts
+import settings
+
+PHASES = ("events", "ai", "rules", "text", "sprites", "display")
+
+
+class FrameProfiler:
+    """Ring buffer of frame times, per-phase times and cache hit rates of the last frames."""
+
+    def __init__(self, capacity: int = settings.PROFILER_CAPACITY) -> None:
+        self.capacity = capacity
+        self.frame_times = array("d", bytes(8 * capacity))  # seconds
+        self.phase_times = {phase: array("d", bytes(8 * capacity)) for phase in PHASES}
+        self.text_hit_rates = array("d", bytes(8 * capacity))
+        self.image_hit_rates = array("d", bytes(8 * capacity))
+        self.count = 0  # frames recorded since the start
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+
+    def start_frame(self) -> None:
+        """Starts timing a new frame."""
+        for phase in self.current:
+            self.current[phase] = 0.0
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """Charges the time since the previous mark to the given phase."""
+        now = time.perf_counter()
+        self.current[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Adds separately timed seconds to the given phase."""
+        self.current[phase] += seconds
+
+    def end_frame(self) -> None:
+        """Stores the timings of the current frame, overwriting the oldest frame when full."""
+        slot = self.count % self.capacity
+        self.frame_times[slot] = time.perf_counter() - self.frame_start
+        for phase, seconds in self.current.items():
+            self.phase_times[phase][slot] = seconds
+        text_info = fonts.get_cache_info()
+        text_lookups = text_info["text_hits"] + text_info["text_misses"]
+        self.text_hit_rates[slot] = text_info["text_hits"] / text_lookups if text_lookups else 0.0
+        image_info = assets.get_cache_info()
+        image_lookups = image_info["image_hits"] + image_info["image_misses"]
+        self.image_hit_rates[slot] = image_info["image_hits"] / image_lookups if image_lookups else 0.0
+        self.count += 1
+
+    def get_slots(self) -> list[int]:
+        """Returns the ring buffer slots of the recorded frames, oldest first."""
+        if self.count <= self.capacity:
+            return list(range(self.count))
+        start = self.count % self.capacity
+        return list(range(start, self.capacity)) + list(range(start))
+
+    def get_percentile(self, percentile: float) -> float:
+        """Returns the given percentile of the recorded frame times in seconds."""
+        frame_times = sorted(self.frame_times[slot] for slot in self.get_slots())
+        if not frame_times:
+            return 0.0
+        return frame_times[min(len(frame_times) - 1, int(len(frame_times) * percentile / 100))]
+
+    def get_summary(self) -> dict:
+        """Returns p50/p99 frame times, mean phase times in milliseconds and the latest cache hit rates."""
+        slots = self.get_slots()
+        frames = len(slots)
+        latest = slots[-1] if slots else 0
+        return {
+            "frames": frames,
+            "p50_ms": self.get_percentile(50) * 1000,
+            "p99_ms": self.get_percentile(99) * 1000,
+            "phases_ms": {phase: sum(times[slot] for slot in slots) / frames * 1000 if frames else 0.0
+                          for phase, times in self.phase_times.items()},
+            "text_hit_rate": self.text_hit_rates[latest],
+            "image_hit_rate": self.image_hit_rates[latest],
+        }
+
+    def dump(self, path: str) -> None:
+        """Writes the recorded frames, oldest first, to a .csv file or otherwise a .json file."""
+        columns = ("frame", "frame_ms") + tuple(f"{phase}_ms" for phase in PHASES) + \
+            ("text_hit_rate", "image_hit_rate")
+        rows = []
+        for frame, slot in enumerate(self.get_slots(), max(0, self.count - self.capacity)):
+            rows.append((frame, self.frame_times[slot] * 1000)
+                        + tuple(self.phase_times[phase][slot] * 1000 for phase in PHASES)
+                        + (self.text_hit_rates[slot], self.image_hit_rates[slot]))
+        with open(path, "w", newline="") as dump_file:
+            if path.endswith(".csv"):
+                writer = csv.writer(dump_file)
+                writer.writerow(columns)
+                writer.writerows(rows)
+            else:
+                json.dump({"summary": self.get_summary(), "frames": [dict(zip(columns, row)) for row in rows]},
+                          dump_file, indent=2)
+
+
+class ProfilerOverlaySprite(pg.sprite.DirtySprite):
+    """Dirty sprite showing the profiler summary in the top left corner of the window."""
+
+    _layer = 2  # drawn above the tiles
+
+    def __init__(self, profiler: FrameProfiler) -> None:
+        pg.sprite.DirtySprite.__init__(self)
+        self.profiler = profiler
+        self.image = pg.Surface((1, 1), pg.SRCALPHA)
+        self.rect = self.image.get_rect(topleft=(0, 0))
+        self.visible = 0
+        self.last_refresh = 0.0
+
+    def refresh(self) -> None:
+        """Re-renders the summary, at most every PROFILER_OVERLAY_INTERVAL seconds."""
+        now = time.perf_counter()
+        if not self.visible or now - self.last_refresh < settings.PROFILER_OVERLAY_INTERVAL:
+            return
+        self.last_refresh = now
+        summary = self.profiler.get_summary()
+        phases = [f"{phase} {ms:.2f}" for phase, ms in summary["phases_ms"].items()]
+        lines = [f"p50 {summary['p50_ms']:.2f} ms  p99 {summary['p99_ms']:.2f} ms",
+                 "  ".join(phases[:len(phases) // 2]),
+                 "  ".join(phases[len(phases) // 2:]),
+                 f"text hits {summary['text_hit_rate']:.0%}  image hits {summary['image_hit_rate']:.0%}"]
+        font = fonts.get_font(settings.FONT, settings.PROFILER_FONT_SIZE)
+        line_surfaces = [font.render(line, True, settings.PROFILER_FONT_COLOR) for line in lines]
+        width = max(surface.get_width() for surface in line_surfaces)
+        height = sum(surface.get_height() for surface in line_surfaces)
+        self.image = pg.Surface((width, height), pg.SRCALPHA)
+        self.image.fill(settings.PROFILER_BG_COLOR)
+        y = 0
+        for surface in line_surfaces:
+            self.image.blit(surface, (0, y))
+            y += surface.get_height()
+        self.rect = self.image.get_rect(topleft=(0, 0))
+        self.dirty = 1
+
+    def toggle(self) -> None:
+        """Shows or hides the overlay."""
+        self.visible = int(not self.visible)
+        self.last_refresh = 0.0
+        self.refresh()
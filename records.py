@@ -0,0 +1,236 @@
+"""Append-only binary log of played games, with a streaming reader and a headless replayer.
+
+File layout: 8 byte file header (magic, version) followed by one record per game. A record
+is a 5 byte game header (grid_division, win_length, move count, outcome) followed by one
+byte per move holding the move's engine.Board bitboard index, so boards up to 16x16 fit.
+The outcome is stored so replaying the moves through the rules can validate it.
+
+Games are written through a large write buffer, so recording a game is a memory copy and
+the file is only written every RECORD_BUFFER_SIZE bytes. Reading goes through mmap one
+game at a time, so replaying uses constant memory whatever the size of the file.
+
+An interrupted recording can leave a partial game at the end of the file. Reading reports
+it as a DamagedTailError after the last complete game, and opening the file for recording
+again cuts it off, so new games are never appended after a partial one.
+
+Usage: python records.py generate --games 1000000 --output games.ttr
+       python records.py replay games.ttr
+"""
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import time
+from typing import Iterator, Sequence
+
+import engine
+import settings
+
+MAGIC = b"TTTR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sB3x")
+GAME_HEADER = struct.Struct("<BBHB")
+UNFINISHED, CROSS_WIN, CIRCLE_WIN, TIE = range(4)
+OUTCOME_NAMES = ("unfinished", "cross_wins", "circle_wins", "ties")
+MAX_GRID_DIVISION = 16  # a move is one byte
+
+
+class DamagedTailError(ValueError):
+    """Raised after the last complete game of a record file that ends in a partial or unreadable game."""
+
+    def __init__(self, path: str, offset: int, size: int) -> None:
+        super().__init__(f"{path} has {size - offset} bytes after its last complete game at byte {offset} "
+                         f"that are not a complete game.")
+        self.offset = offset  # end of the last complete game
+        self.size = size
+
+
+def get_outcome(board: engine.Board) -> int:
+    """Returns the outcome code of the game on the board."""
+    match board.get_winner():
+        case "cross":
+            return CROSS_WIN
+        case "circle":
+            return CIRCLE_WIN
+    return UNFINISHED if board.is_winnable() else TIE
+
+
+class GameRecorder:
+    """Appends finished games to a record file through a write buffer."""
+
+    def __init__(self, path: str, buffer_size: int = settings.RECORD_BUFFER_SIZE) -> None:
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "r+b") as record_file:
+                with mmap.mmap(record_file.fileno(), 0, access=mmap.ACCESS_READ) as records:
+                    check_file_header(records[:FILE_HEADER.size], path)
+                    end = FILE_HEADER.size
+                    for *_, end in walk_games(records):
+                        pass
+                record_file.truncate(end)  # drop a partial game left by an interrupted recording
+        self.file = open(path, "ab", buffering=buffer_size)
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def record(self, board: engine.Board, win_length: int, moves: Sequence[int]) -> None:
+        """Appends the game with the given moves, played on the board, to the write buffer."""
+        if board.grid_division > MAX_GRID_DIVISION:
+            raise ValueError(f"Only boards up to {MAX_GRID_DIVISION}x{MAX_GRID_DIVISION} can be recorded.")
+        self.file.write(GAME_HEADER.pack(board.grid_division, win_length, len(moves), get_outcome(board)))
+        self.file.write(bytes(moves))
+
+    def flush(self) -> None:
+        """Writes the buffered games to the file."""
+        self.file.flush()
+
+    def close(self) -> None:
+        """Writes the buffered games and closes the file."""
+        self.file.close()
+
+    def __enter__(self) -> "GameRecorder":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def check_file_header(header: bytes, path: str) -> None:
+    """Raises ValueError if the header isn't a supported record file header."""
+    if len(header) < FILE_HEADER.size or FILE_HEADER.unpack_from(header) != (MAGIC, VERSION):
+        raise ValueError(f"{path} is not a version {VERSION} game record file.")
+
+
+def walk_games(records: mmap.mmap) -> Iterator[tuple[int, int, int, int, int]]:
+    """Yields (grid_division, win_length, outcome, moves offset, end offset) for every complete game.
+
+    Stops at the end of the records or at the first game that is cut off or whose header is
+    out of range, which happens when a partial game was followed by more bytes.
+    """
+    offset = FILE_HEADER.size
+    size = len(records)
+    while offset + GAME_HEADER.size <= size:
+        grid_division, win_length, move_count, outcome = GAME_HEADER.unpack_from(records, offset)
+        start = offset + GAME_HEADER.size
+        end = start + move_count
+        if (end > size or not 1 <= win_length <= grid_division <= MAX_GRID_DIVISION
+                or move_count > grid_division**2 or outcome > TIE):
+            return
+        yield grid_division, win_length, outcome, start, end
+        offset = end
+
+
+def read_games(path: str) -> Iterator[tuple[int, int, int, bytes]]:
+    """Yields (grid_division, win_length, outcome, moves) for every game in the record file.
+    Raises DamagedTailError after the last complete game if the file doesn't end there.
+    """
+    with open(path, "rb") as record_file:
+        if os.fstat(record_file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(record_file.fileno(), 0, access=mmap.ACCESS_READ) as records:
+            check_file_header(records[:FILE_HEADER.size], path)
+            end = FILE_HEADER.size
+            for grid_division, win_length, outcome, start, end in walk_games(records):
+                yield grid_division, win_length, outcome, records[start:end]
+            if end != len(records):
+                raise DamagedTailError(path, end, len(records))
+
+
+def replay(path: str) -> dict:
+    """Replays every recorded game through the rules engine and returns outcome statistics.
+
+    A game is invalid if a move is off the board, on a taken grid slot or after the game
+    ended, and mismatched if the replayed outcome differs from the recorded one. Bytes after
+    the last complete game are reported as the damaged tail.
+    """
+    boards = {}
+    sizes = {}
+    invalid = mismatched = 0
+    damaged_tail = None
+    start = time.perf_counter()
+    try:
+        for grid_division, win_length, outcome, moves in read_games(path):
+            key = grid_division, win_length
+            board = boards.get(key)
+            if board is None:
+                board = boards[key] = engine.create_board(grid_division, win_length)
+                sizes[key] = dict.fromkeys(("games", "moves") + OUTCOME_NAMES, 0)
+            else:
+                board.reset()
+            stats = sizes[key]
+            stats["games"] += 1
+            stats["moves"] += len(moves)
+            cells = grid_division**2
+            over = False
+            for move in moves:
+                if over or move >= cells or not board.is_empty(move):
+                    invalid += 1
+                    break
+                board.play(board.get_turn(), move)
+                over = board.winner is not None or not board.is_winnable()
+            else:
+                replayed = get_outcome(board)
+                stats[OUTCOME_NAMES[replayed]] += 1
+                mismatched += replayed != outcome
+    except DamagedTailError as error:
+        damaged_tail = {"offset": error.offset, "bytes": error.size - error.offset}
+    elapsed = time.perf_counter() - start
+
+    games = sum(stats["games"] for stats in sizes.values())
+    for stats in sizes.values():
+        stats["mean_length"] = round(stats["moves"] / stats["games"], 3)
+    return {
+        "games": games,
+        "invalid": invalid,
+        "mismatched": mismatched,
+        "damaged_tail": damaged_tail,
+        "seconds": round(elapsed, 3),
+        "games_per_second": round(games / elapsed) if elapsed else None,
+        "boards": {f"{grid_division}x{grid_division} win {win_length}": stats
+                   for (grid_division, win_length), stats in sizes.items()},
+    }
+
+
+def generate(path: str, games: int, grid_division: int, win_length: int, seed: int) -> None:
+    """Appends random games to the record file."""
+    rng = random.Random(seed)
+    board = engine.create_board(grid_division, win_length)
+    cells = list(range(grid_division**2))
+    with GameRecorder(path) as recorder:
+        for _ in range(games):
+            board.reset()
+            rng.shuffle(cells)
+            moves = []
+            for move in cells:
+                board.play(board.get_turn(), move)
+                moves.append(move)
+                if board.winner is not None or not board.is_winnable():
+                    break
+            recorder.record(board, win_length, moves)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write and replay Tic Tac Toe game record files.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate_parser = subparsers.add_parser("generate", help="append random games to a record file")
+    generate_parser.add_argument("--games", type=int, default=1_000_000)
+    generate_parser.add_argument("--grid-division", type=int, default=settings.GRID_DIVISION)
+    generate_parser.add_argument("--win-length", type=int, default=None)
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument("--output", default=settings.RECORD_PATH or "games.ttr")
+    replay_parser = subparsers.add_parser("replay", help="validate a record file and print statistics")
+    replay_parser.add_argument("path")
+    args = parser.parse_args()
+
+    match args.command:
+        case "generate":
+            win_length = engine.get_win_length(args.grid_division, args.win_length)
+            start = time.perf_counter()
+            generate(args.output, args.games, args.grid_division, win_length, args.seed)
+            print(f"Wrote {args.games} games to {args.output} in {time.perf_counter() - start:.1f}s.")
+        case "replay":
+            print(json.dumps(replay(args.path), indent=2))
+
+
+if __name__ == "__main__":
+    main()
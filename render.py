@@ -0,0 +1,171 @@
+"""Headless renderer for board thumbnails and contact sheets of many games.
+
+Boards are drawn like the game window draws them, with the grid background and the cross and
+circle images from settings.py, scaled once per tile size through the assets cache. A contact
+sheet blits the backgrounds of all its boards in one Surface.blits call and then all of their
+marks in another. Runs on SDL's dummy video driver unless another driver is set.
+
+Usage: python render.py sheet games.ttr --output sheet.png --games 1000
+       python render.py thumbnails games.ttr --output-dir thumbnails --games 100
+"""
+import argparse
+import math
+import os
+import time
+from typing import Iterator, Sequence
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame as pg  # noqa: E402
+
+import assets  # noqa: E402
+import engine  # noqa: E402
+import records  # noqa: E402
+import settings  # noqa: E402
+import utils  # noqa: E402
+
+RAW_FORMAT = "RGB"  # pixel format of raw buffers, see pg.image.tobytes
+
+
+def get_bitboards(moves: Sequence[int]) -> tuple[int, int]:
+    """Returns the cross and circle bitboards after the given moves, cross moves first."""
+    cross = circle = 0
+    for move in moves[0::2]:
+        cross |= 1 << move
+    for move in moves[1::2]:
+        circle |= 1 << move
+    return cross, circle
+
+
+def read_boards(path: str, grid_division: int, limit: int | None = None) -> Iterator[tuple[int, int]]:
+    """Yields the final cross and circle bitboards of the recorded games with the given board size."""
+    count = 0
+    for game_grid_division, _, _, moves in records.read_games(path):
+        if limit is not None and count >= limit:
+            return
+        if game_grid_division == grid_division:
+            yield get_bitboards(moves)
+            count += 1
+
+
+class BoardRenderer:
+    """Draws boards of one size, given as cross and circle bitboards, 'tile_size' pixels wide."""
+
+    def __init__(self,
+                 grid_division: int,
+                 tile_size: int = settings.RENDER_TILE_SIZE,
+                 margin: int = settings.RENDER_MARGIN) -> None:
+        if pg.display.get_surface() is None:  # convert() needs a display mode, a 1x1 one is enough
+            pg.display.init()
+            pg.display.set_mode((1, 1))
+        self.grid_division = grid_division
+        self.tile_size = tile_size
+        self.margin = margin
+        self.background = pg.Surface((tile_size, tile_size)).convert()
+        self.background.fill(settings.WINDOW_BG_COLOR)
+        self.background.blit(utils.get_grid_background(tile_size, grid_division), (0, 0))
+
+        # Mark images and their top left corners in every grid slot, same as TicTacToe.get_grid_center
+        mark_scale = tile_size / grid_division / settings.MARK_IMAGE_SLOT_SIZE
+        self.marks = {engine.CROSS: assets.get_image(settings.CROSS_IMAGE, (mark_scale, mark_scale)),
+                      engine.CIRCLE: assets.get_image(settings.CIRCLE_IMAGE, (mark_scale, mark_scale))}
+        slot_size = tile_size / grid_division
+        self.offsets = {}
+        for sprite_type, image in self.marks.items():
+            offsets = []
+            for index in range(grid_division**2):
+                ix, iy = engine.cell_indices(index, grid_division)
+                center = int(slot_size / 2 + ix * slot_size), int(slot_size / 2 + iy * slot_size)
+                offsets.append(image.get_rect(center=center).topleft)
+            self.offsets[sprite_type] = tuple(offsets)
+
+    def get_blits(self, cross: int, circle: int, position: tuple[int, int]) -> list[tuple[pg.Surface, tuple]]:
+        """Returns the (mark surface, destination) pairs of a board drawn with its top left corner at the position."""
+        x, y = position
+        blits = []
+        for sprite_type, bitboard in ((engine.CROSS, cross), (engine.CIRCLE, circle)):
+            image = self.marks[sprite_type]
+            offsets = self.offsets[sprite_type]
+            while bitboard:
+                low_bit = bitboard & -bitboard
+                offset_x, offset_y = offsets[low_bit.bit_length() - 1]
+                blits.append((image, (x + offset_x, y + offset_y)))
+                bitboard ^= low_bit
+        return blits
+
+    def render(self, cross: int, circle: int) -> pg.Surface:
+        """Returns a new surface with the board."""
+        surface = self.background.copy()
+        surface.blits(self.get_blits(cross, circle, (0, 0)), doreturn=False)
+        return surface
+
+    def render_sheet(self, boards: Sequence[tuple[int, int]], columns: int | None = None) -> pg.Surface:
+        """Returns one surface with the boards in rows of 'columns' boards, as square as possible by default."""
+        columns = columns or max(1, math.ceil(math.sqrt(len(boards))))
+        rows = max(1, math.ceil(len(boards) / columns))
+        step = self.tile_size + self.margin
+        sheet = pg.Surface((columns * step + self.margin, rows * step + self.margin)).convert()
+        sheet.fill(settings.RENDER_SHEET_BG_COLOR)
+        positions = [(self.margin + board % columns * step, self.margin + board // columns * step)
+                     for board in range(len(boards))]
+        sheet.blits([(self.background, position) for position in positions], doreturn=False)
+        marks = []
+        for (cross, circle), position in zip(boards, positions):
+            marks.extend(self.get_blits(cross, circle, position))
+        sheet.blits(marks, doreturn=False)
+        return sheet
+
+
+def to_raw(surface: pg.Surface) -> bytes:
+    """Returns the pixels of the surface as a raw RAW_FORMAT buffer, row by row."""
+    return pg.image.tobytes(surface, RAW_FORMAT)
+
+
+def save(surface: pg.Surface, path: str) -> None:
+    """Writes the surface to a .raw file with the raw pixel buffer, or an image file such as .png otherwise."""
+    if path.endswith(".raw"):
+        with open(path, "wb") as raw_file:
+            raw_file.write(to_raw(surface))
+    else:
+        pg.image.save(surface, path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render recorded Tic Tac Toe games without a window.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("sheet", "render the games on one contact sheet"),
+                            ("thumbnails", "render every game to its own file")):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("records", help="game record file, see records.py")
+        subparser.add_argument("--games", type=int, default=None, help="defaults to every game")
+        subparser.add_argument("--grid-division", type=int, default=settings.GRID_DIVISION)
+        subparser.add_argument("--tile-size", type=int, default=settings.RENDER_TILE_SIZE)
+    sheet_parser = subparsers.choices["sheet"]
+    sheet_parser.add_argument("--columns", type=int, default=None)
+    sheet_parser.add_argument("--output", default="sheet.png", help=".png, .bmp, .tga, .jpg or .raw")
+    thumbnails_parser = subparsers.choices["thumbnails"]
+    thumbnails_parser.add_argument("--output-dir", default="thumbnails")
+    thumbnails_parser.add_argument("--format", choices=("png", "raw"), default="png")
+    args = parser.parse_args()
+
+    renderer = BoardRenderer(args.grid_division, args.tile_size)
+    boards = list(read_boards(args.records, args.grid_division, args.games))
+    start = time.perf_counter()
+    match args.command:
+        case "sheet":
+            sheet = renderer.render_sheet(boards, args.columns)
+            rendered = time.perf_counter()
+            save(sheet, args.output)
+            print(f"Rendered {len(boards)} boards in {rendered - start:.2f}s to a {sheet.get_width()}x"
+                  f"{sheet.get_height()} sheet, saved {args.output} in {time.perf_counter() - rendered:.2f}s.")
+        case "thumbnails":
+            os.makedirs(args.output_dir, exist_ok=True)
+            for game, (cross, circle) in enumerate(boards):
+                save(renderer.render(cross, circle), os.path.join(args.output_dir, f"{game}.{args.format}"))
+            elapsed = time.perf_counter() - start
+            print(f"Rendered {len(boards)} boards to {args.output_dir} in {elapsed:.2f}s, "
+                  f"{len(boards) / elapsed if elapsed else 0:.0f} boards/s.")
+
+
+if __name__ == "__main__":
+    main()
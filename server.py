@@ -0,0 +1,330 @@
+"""Asyncio server hosting many Tic Tac Toe games in one process, with a load-generator client.
+
+Thin clients connect over TCP or a Unix socket and can host many games on one connection.
+Every game is a small Session around an engine.Board, the rules TicTacToe uses, and all
+boards share the line tables of one template board, so a session costs a few hundred bytes.
+
+Protocol, one ASCII request per line, answered with one reply line in request order:
+    NEW                 -> OK <game> TURN cross
+    MOVE <game> <x> <y> -> OK <game> TURN <cross|circle>, OK <game> WIN <cross|circle> or OK <game> TIE
+    RESET <game>        -> OK <game> TURN cross
+    CLOSE <game>        -> OK <game> CLOSED
+Failed requests are answered with 'ERR <game or -> <reason>'. Game ids belong to the
+connection that created them and are freed when it closes.
+
+Backpressure: a connection is not read while its unsent replies exceed
+SERVER_WRITE_BUFFER_SIZE, and the unread requests of a connection are capped at
+SERVER_READ_BUFFER_SIZE, so a client that doesn't read its replies is throttled by TCP.
+
+Usage: python server.py serve --port 8765
+       python server.py load --port 8765 --connections 100 --games 10000 --duration 10
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import time
+from array import array
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Unix only, the stats report leaves out the max RSS without it
+    resource = None
+
+import engine
+import settings
+
+
+class Session:
+    """One game hosted by the server."""
+
+    __slots__ = ("board",)
+
+    def __init__(self, board: engine.Board) -> None:
+        self.board = board
+
+    def add_turn(self, ix: int, iy: int) -> None:
+        """Places the sprite whose turn it is in the grid slot at the given grid indexes."""
+        self.board.play(self.board.get_turn(), engine.cell_index(ix, iy, self.board.grid_division))
+
+    def get_winner(self) -> str | None:
+        """Returns a winner if someone has won the game."""
+        return self.board.get_winner()
+
+    def is_winnable(self) -> bool:
+        """Checks if any combination can still be completed by one of the players."""
+        return self.board.is_winnable()
+
+    def reset(self) -> None:
+        """Clears the board."""
+        self.board.reset()
+
+    def get_status(self) -> str:
+        """Returns the status part of a reply: whose turn it is, the winner or a tie."""
+        winner = self.get_winner()
+        if winner is not None:
+            return f"WIN {winner}"
+        if not self.is_winnable():
+            return "TIE"
+        return f"TURN {self.board.get_turn()}"
+
+
+class GameServer:
+    """Serves the line protocol for every connection from one event loop."""
+
+    def __init__(self,
+                 grid_division: int,
+                 win_length: int,
+                 max_sessions: int = settings.SERVER_MAX_SESSIONS,
+                 max_sessions_per_connection: int = settings.SERVER_MAX_SESSIONS_PER_CONNECTION) -> None:
+        self.template = engine.create_board(grid_division, win_length)
+        self.max_sessions = max_sessions
+        self.max_sessions_per_connection = max_sessions_per_connection
+        self.session_count = 0
+        self.connection_count = 0
+        self.move_count = 0
+
+    def handle_request(self, sessions: dict[int, Session], game_ids: itertools.count, line: bytes) -> str:
+        """Runs one request line against the sessions of a connection and returns the reply line."""
+        match line.split():
+            case [b"NEW"]:
+                if self.session_count >= self.max_sessions or len(sessions) >= self.max_sessions_per_connection:
+                    return "ERR - too many games\n"
+                game_id = next(game_ids)
+                sessions[game_id] = Session(self.template.empty_copy())
+                self.session_count += 1
+                return f"OK {game_id} TURN {engine.CROSS}\n"
+            case [b"MOVE", game_id, x, y]:
+                session = sessions.get(to_int(game_id))
+                if session is None:
+                    return f"ERR {game_id.decode(errors='replace')} unknown game\n"
+                if session.get_winner() is not None or not session.is_winnable():
+                    return f"ERR {game_id.decode()} game over\n"
+                ix, iy = to_int(x), to_int(y)
+                if ix is None or iy is None or not (0 <= ix < self.template.grid_division
+                                                    and 0 <= iy < self.template.grid_division):
+                    return f"ERR {game_id.decode()} bad grid indexes\n"
+                try:
+                    session.add_turn(ix, iy)
+                except ValueError:
+                    return f"ERR {game_id.decode()} grid slot taken\n"
+                self.move_count += 1
+                return f"OK {game_id.decode()} {session.get_status()}\n"
+            case [b"RESET", game_id]:
+                session = sessions.get(to_int(game_id))
+                if session is None:
+                    return f"ERR {game_id.decode(errors='replace')} unknown game\n"
+                session.reset()
+                return f"OK {game_id.decode()} TURN {engine.CROSS}\n"
+            case [b"CLOSE", game_id]:
+                if sessions.pop(to_int(game_id), None) is None:
+                    return f"ERR {game_id.decode(errors='replace')} unknown game\n"
+                self.session_count -= 1
+                return f"OK {game_id.decode()} CLOSED\n"
+            case _:
+                return "ERR - unknown request\n"
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answers the requests of one client until it disconnects."""
+        writer.transport.set_write_buffer_limits(high=settings.SERVER_WRITE_BUFFER_SIZE)
+        sessions: dict[int, Session] = {}
+        game_ids = itertools.count()
+        self.connection_count += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # request line longer than the read buffer
+                    writer.write(b"ERR - request too long\n")
+                    break
+                if not line:
+                    break
+                writer.write(self.handle_request(sessions, game_ids, line).encode())
+                await writer.drain()  # only waits while the client isn't reading its replies
+        except ConnectionError:
+            pass
+        finally:
+            self.connection_count -= 1
+            self.session_count -= len(sessions)
+            writer.close()
+
+    async def report(self, interval: float) -> None:
+        """Prints the connection, game and move counts every interval seconds."""
+        last_moves, last_time = self.move_count, time.perf_counter()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            line = (f"{self.connection_count} connections, {self.session_count} games, "
+                    f"{(self.move_count - last_moves) / (now - last_time):,.0f} moves/s")
+            if resource is not None:
+                line += f", max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB"
+            print(line, flush=True)
+            last_moves, last_time = self.move_count, now
+
+    async def serve(self, host: str, port: int, unix_path: str | None = None, stats_interval: float = 0) -> None:
+        """Serves on the TCP address, or the Unix socket if a path is given, until cancelled."""
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path,
+                                                     limit=settings.SERVER_READ_BUFFER_SIZE)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port,
+                                                limit=settings.SERVER_READ_BUFFER_SIZE)
+        print(f"Serving {self.template.grid_division}x{self.template.grid_division} games on "
+              f"{unix_path or f'{host}:{port}'}.", flush=True)
+        async with server:
+            if stats_interval:
+                reporter = asyncio.create_task(self.report(stats_interval))
+            try:
+                await server.serve_forever()
+            finally:
+                if stats_interval:
+                    reporter.cancel()
+
+
+def to_int(text: bytes) -> int | None:
+    """Returns the integer in the text, or None if it isn't one."""
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+class LoadConnection:
+    """Client connection that plays many games at once, matching replies to requests in order."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.pending: deque[asyncio.Future] = deque()
+
+    async def request(self, line: str) -> list[str]:
+        """Sends a request line and returns the split reply line."""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+        self.writer.write(line.encode())
+        await self.writer.drain()
+        return await future
+
+    async def read_replies(self) -> None:
+        """Resolves the pending requests with the reply lines as they arrive."""
+        while line := await self.reader.readline():
+            self.pending.popleft().set_result(line.decode().split())
+        while self.pending:  # the server closed the connection
+            self.pending.popleft().set_exception(ConnectionError("Connection closed by the server."))
+
+
+async def play_games(connection: LoadConnection,
+                     grid_division: int,
+                     deadline: float,
+                     rng: random.Random,
+                     latencies: array,
+                     counts: dict[str, int]) -> None:
+    """Plays random games on one server session until the deadline, recording every move's latency."""
+    reply = await connection.request("NEW\n")
+    if reply[0] != "OK":
+        counts["refused"] += 1
+        return
+    game_id = reply[1]
+    counts["games"] += 1
+    cells = [(ix, iy) for ix in range(grid_division) for iy in range(grid_division)]
+    while time.perf_counter() < deadline:
+        rng.shuffle(cells)
+        for ix, iy in cells:
+            start = time.perf_counter()
+            reply = await connection.request(f"MOVE {game_id} {ix} {iy}\n")
+            latencies.append(time.perf_counter() - start)
+            if reply[0] != "OK":
+                raise RuntimeError(f"Unexpected reply: {' '.join(reply)}")
+            if reply[2] != "TURN":
+                counts[reply[2].lower()] += 1
+                break
+        await connection.request(f"RESET {game_id}\n")
+    await connection.request(f"CLOSE {game_id}\n")
+
+
+async def generate_load(host: str,
+                        port: int,
+                        unix_path: str | None,
+                        connections: int,
+                        games: int,
+                        duration: float,
+                        grid_division: int,
+                        seed: int) -> dict:
+    """Plays 'games' concurrent games over 'connections' connections for 'duration' seconds."""
+    rng = random.Random(seed)
+    latencies = array("d")
+    counts = {"games": 0, "refused": 0, "win": 0, "tie": 0}
+    clients = []
+    for _ in range(connections):
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        clients.append(LoadConnection(reader, writer))
+    readers = [asyncio.create_task(client.read_replies()) for client in clients]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(play_games(clients[game % connections], grid_division, start + duration,
+                                      random.Random(rng.random()), latencies, counts)
+                           for game in range(games)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        client.writer.close()
+    await asyncio.gather(*readers, return_exceptions=True)
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    quantiles = statistics.quantiles(latencies_ms, n=100) if len(latencies_ms) > 1 else [0.0] * 99
+    return {
+        "connections": connections,
+        "concurrent_games": counts["games"],
+        "refused_games": counts["refused"],
+        "finished_games": counts["win"] + counts["tie"],
+        "moves": len(latencies_ms),
+        "moves_per_second": round(len(latencies_ms) / elapsed),
+        "latency_ms": {
+            "p50": round(quantiles[49], 3),
+            "p90": round(quantiles[89], 3),
+            "p99": round(quantiles[98], 3),
+            "max": round(latencies_ms[-1], 3) if latencies_ms else 0.0,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Host many Tic Tac Toe games over a line protocol.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("serve", "run the game server"), ("load", "generate load against a server")):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("--host", default=settings.SERVER_HOST)
+        subparser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+        subparser.add_argument("--unix", default=None, help="Unix socket path, used instead of TCP")
+        subparser.add_argument("--grid-division", type=int, default=settings.GRID_DIVISION)
+    serve_parser = subparsers.choices["serve"]
+    serve_parser.add_argument("--win-length", type=int, default=None)
+    serve_parser.add_argument("--stats-interval", type=float, default=5.0, help="0 disables the reports")
+    load_parser = subparsers.choices["load"]
+    load_parser.add_argument("--connections", type=int, default=100)
+    load_parser.add_argument("--games", type=int, default=10_000, help="games played at once")
+    load_parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    load_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    match args.command:
+        case "serve":
+            win_length = engine.get_win_length(args.grid_division, args.win_length)
+            server = GameServer(args.grid_division, win_length)
+            try:
+                asyncio.run(server.serve(args.host, args.port, args.unix, args.stats_interval))
+            except KeyboardInterrupt:
+                pass
+        case "load":
+            report = asyncio.run(generate_load(args.host, args.port, args.unix, args.connections, args.games,
+                                               args.duration, args.grid_division, args.seed))
+            print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,19 +14,58 @@ SCREEN_HEIGHT = SCREEN_WIDTH + SCREEN_HEIGHT_OFFSET
 """MAIN_DIR = os.path.split(os.path.abspath(__file__))[0]
 DATA_DIR = os.path.join(MAIN_DIR, "data")"""
 
+# Board grid, boards larger than MAX_WIN_LENGTH are won by MAX_WIN_LENGTH in a row
+GRID_DIVISION = 3
+MAX_WIN_LENGTH = 5
+GRID_LINE_COLOR = "black"
+GRID_LINE_WIDTH = 2
+MARK_IMAGE_SLOT_SIZE = 100  # grid slot size the cross and circle images are drawn for
+
+# Computer player, AI_SIDE is "cross" or "circle" to let the computer play that side
+AI_SIDE = None
+AI_MAX_DEPTH = None  # None searches until the time budget runs out
+AI_TIME_BUDGET = 1.0  # seconds per move
+AI_TABLE_SIZE = 200_000  # transposition table entries
+AI_PLAYER = "alphabeta"  # "alphabeta" or "mcts", a perfect-play table is used instead when there is one
+MCTS_EXPLORATION = 1.4  # UCT exploration constant
+
+# Precomputed perfect-play tables, generated with perfect_play.py
+def get_perfect_play_table_path(grid_division: int) -> str:
+    """Get absolute path to the perfect-play table for the given board size"""
+    return get_resource_path(os.path.join("data", f"perfect_play_{grid_division}x{grid_division}.bin"))
+
+
+# Multi-game server, see server.py
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_MAX_SESSIONS = 50_000  # games hosted at once over every connection
+SERVER_MAX_SESSIONS_PER_CONNECTION = 1024
+SERVER_READ_BUFFER_SIZE = 16 * 1024  # bytes of unread requests, also the longest allowed request line
+SERVER_WRITE_BUFFER_SIZE = 64 * 1024  # bytes of unsent replies before a connection stops being read
+
+# Game records, RECORD_PATH is a file path like "games.ttr" to append every played game to it
+RECORD_PATH = None
+RECORD_BUFFER_SIZE = 64 * 1024  # bytes of games buffered in memory between file writes
+
+# Headless board renderer, see render.py
+RENDER_TILE_SIZE = 64  # pixels per board
+RENDER_MARGIN = 4  # pixels between the boards of a contact sheet
+RENDER_SHEET_BG_COLOR = "lightgray"
+
 # Game window title and icon
 WINDOW_TITLE = "Tic Tac Toe"
 WINDOW_BG_COLOR = "white"
+FPS = 60  # frame rate cap, 0 for uncapped
 
 # Background
-BACKGROUND_IMAGE = get_resource_path(r"data\background_grid.png")
+BACKGROUND_IMAGE = get_resource_path(os.path.join("data", "background_grid.png"))
 
 # Window icon
-ICON_IMAGE = get_resource_path(r"data\tic_tac_toe_icon.png")
+ICON_IMAGE = get_resource_path(os.path.join("data", "tic_tac_toe_icon.png"))
 
 # Game sprites image filenames
-CROSS_IMAGE = get_resource_path(r"data\red_cross.png")
-CIRCLE_IMAGE = get_resource_path(r"data\blue_circle.png")
+CROSS_IMAGE = get_resource_path(os.path.join("data", "red_cross.png"))
+CIRCLE_IMAGE = get_resource_path(os.path.join("data", "blue_circle.png"))
 """# Background
 BACKGROUND_IMAGE = os.path.join(DATA_DIR, "background_grid.png")
 
@@ -45,6 +84,7 @@ FONT_COLOR = "black"
 GAME_OVER_FONT_COLOR = "purple"
 TEXT_POSITION = 4, 315  # anchor topleft
 TEXT_WIDTH = 16
+TEXT_CACHE_SIZE = 64  # rendered text surfaces kept in memory
 
 # Bottom image sprite
 BOTTOM_SPRITE_SCALE = 0.5
@@ -62,3 +102,13 @@ RESET_FONT_SIZE = 18
 RESET_FONT_COLOR = "white"
 RESET_TEXT_POSITION = RESET_BUTTON_POSITION[0] + RESET_BUTTON_SIZE[0] / 10, \
                       RESET_BUTTON_POSITION[1] + RESET_BUTTON_SIZE[1] / 5  # (anchor center)
+
+# Frame profiler, the overlay is toggled with PROFILER_OVERLAY_KEY and frames are dumped on exit
+PROFILER_ENABLED = False
+PROFILER_CAPACITY = 1000  # frames kept in the ring buffer
+PROFILER_DUMP_PATH = "profile.csv"  # .csv or .json
+PROFILER_OVERLAY_KEY = "f3"
+PROFILER_OVERLAY_INTERVAL = 0.5  # seconds between overlay refreshes
+PROFILER_FONT_SIZE = 14
+PROFILER_FONT_COLOR = "black"
+PROFILER_BG_COLOR = 255, 255, 255, 200
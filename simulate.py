@@ -0,0 +1,141 @@
+"""Vectorised batch self-play that plays thousands of Tic Tac Toe games at once with NumPy.
+
+Every batch is a (games, grid slots) array with 1 for cross, -1 for circle and 0 for empty.
+Games are played in lockstep, finished games are masked out, and wins and ties are detected
+with the same rules as engine.Board: a win is a full win combination and a tie is a board
+where no combination can be completed any more, because it holds both players or because
+its only possible owner has fewer moves left than it has empty slots.
+
+Usage: python simulate.py --games 1000000 --grid-division 3
+"""
+import argparse
+import json
+import time
+from typing import Callable
+
+import numpy as np
+
+import engine
+import settings
+
+Policy = Callable[[np.ndarray, int, np.random.Generator], np.ndarray]
+
+
+def get_line_matrix(grid_division: int, win_length: int) -> np.ndarray:
+    """Returns a (combinations, grid slots) matrix with a 1 for every grid slot in each win combination."""
+    combinations = engine.generate_win_combinations(grid_division, win_length)
+    lines = np.zeros((len(combinations), grid_division**2), dtype=np.float32)
+    for line, combination in enumerate(combinations):
+        for ix, iy in combination:
+            lines[line, engine.cell_index(ix, iy, grid_division)] = 1
+    return lines
+
+
+def random_policy(boards: np.ndarray, player: int, rng: np.random.Generator) -> np.ndarray:
+    """Returns a uniformly random empty grid slot for every board."""
+    scores = rng.random(boards.shape, dtype=np.float32)
+    scores[boards != 0] = -1
+    return scores.argmax(axis=1)
+
+
+def play_batch(games: int,
+               grid_division: int,
+               win_length: int,
+               policy: Policy,
+               rng: np.random.Generator,
+               lines: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Plays a batch of games to the end.
+
+    Returns the winner (1 cross, -1 circle, 0 tie), the number of moves and the first move of every game.
+    """
+    if lines is None:
+        lines = get_line_matrix(grid_division, win_length)
+    lines_t = lines.T
+    cells = grid_division**2
+    boards = np.zeros((games, cells), dtype=np.float32)
+    winners = np.zeros(games, dtype=np.int8)
+    lengths = np.zeros(games, dtype=np.int32)
+    first_moves = np.zeros(games, dtype=np.int32)
+    active = np.arange(games)
+    player = 1  # cross begins
+    for ply in range(cells):
+        if active.size == 0:
+            break
+        active_boards = boards[active]
+        moves = policy(active_boards, player, rng)
+        active_boards[np.arange(active.size), moves] = player
+        boards[active] = active_boards
+        lengths[active] += 1
+        if ply == 0:
+            first_moves[active] = moves
+
+        own_counts = (active_boards == player).astype(np.float32) @ lines_t
+        other_counts = (active_boards == -player).astype(np.float32) @ lines_t
+        won = (own_counts == win_length).any(axis=1)
+        empty = cells - ply - 1
+        live = (((other_counts == 0) & (win_length - own_counts <= empty // 2))
+                | ((own_counts == 0) & (win_length - other_counts <= (empty + 1) // 2))).any(axis=1)
+        winners[active[won]] = player
+        finished = won | ~live | (ply == cells - 1)
+        active = active[~finished]
+        player = -player
+    return winners, lengths, first_moves
+
+
+def simulate(games: int,
+             grid_division: int = 3,
+             win_length: int | None = None,
+             policy: Policy = random_policy,
+             seed: int | None = None,
+             batch_size: int = 100_000) -> dict:
+    """Plays the given number of games in batches and returns aggregate statistics."""
+    win_length = engine.get_win_length(grid_division, win_length)
+    rng = np.random.default_rng(seed)
+    lines = get_line_matrix(grid_division, win_length)
+    cells = grid_division**2
+    outcome_counts = np.zeros(3, dtype=np.int64)  # circle, tie, cross
+    length_histogram = np.zeros(cells + 1, dtype=np.int64)
+    first_move_counts = np.zeros(cells, dtype=np.int64)
+    first_move_totals = np.zeros(cells, dtype=np.int64)
+    for start in range(0, games, batch_size):
+        winners, lengths, first_moves = play_batch(min(batch_size, games - start), grid_division, win_length,
+                                                   policy, rng, lines)
+        outcome_counts += np.bincount(winners.astype(np.int64) + 1, minlength=3)
+        length_histogram += np.bincount(lengths, minlength=cells + 1)
+        first_move_counts += np.bincount(first_moves, minlength=cells)
+        first_move_totals += np.bincount(first_moves, weights=winners, minlength=cells).astype(np.int64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        first_move_values = np.where(first_move_counts > 0, first_move_totals / first_move_counts, np.nan)
+    return {
+        "games": games,
+        "grid_division": grid_division,
+        "win_length": win_length,
+        "cross_win_rate": outcome_counts[2] / games,
+        "circle_win_rate": outcome_counts[0] / games,
+        "tie_rate": outcome_counts[1] / games,
+        "length_histogram": length_histogram.tolist(),
+        # mean result for cross (1 win, 0 tie, -1 loss) by cross' first grid slot, as rows of grid x-indexes
+        "first_move_value": [[None if np.isnan(value) else round(float(value), 4) for value in row]
+                             for row in first_move_values.reshape(grid_division, grid_division)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play random Tic Tac Toe games in vectorised batches.")
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--grid-division", type=int, default=settings.GRID_DIVISION)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = simulate(args.games, args.grid_division, args.win_length, seed=args.seed, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    stats["games_per_second"] = round(args.games / elapsed)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
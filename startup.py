@@ -0,0 +1,25 @@
+"""Launcher that reports how long the game takes to start, split into import, init and first frame.
+
+The imports of main.py, pygame and the game modules are timed from here, before any of them
+is loaded, so run it in a fresh interpreter. 'python main.py --startup-report' runs it for you.
+
+Usage: python startup.py
+"""
+import json
+import time
+
+
+def get_startup_report() -> dict[str, float]:
+    """Imports and starts the game, returning the startup times in milliseconds."""
+    import_start = time.perf_counter()
+    import main
+    import_ms = (time.perf_counter() - import_start) * 1000
+    game = main.create_game()
+    game.start()
+    report = {"import_ms": round(import_ms, 3), **game.get_startup_report()}
+    report["time_to_first_frame_ms"] = round(report["import_ms"] + report["init_ms"] + report["first_frame_ms"], 3)
+    return report
+
+
+if __name__ == "__main__":
+    print(json.dumps(get_startup_report(), indent=2))
@@ -1,22 +1,31 @@
 import pygame as pg
 
+import assets
 
-class TileSprite(pg.sprite.Sprite):
+
+class TileSprite(pg.sprite.DirtySprite):
     """Sprite class for the cross and circle tiles shown on the board."""
 
+    _layer = 1  # drawn above the bottom text
+
     def __init__(self,
                  sprite_type: str,
                  image_file_name: str,
                  position: tuple[int, int],
                  scale: tuple[int | float, int | float] = (1, 1),
                  anchor: str = "center"):
-        pg.sprite.Sprite.__init__(self)
+        pg.sprite.DirtySprite.__init__(self)
+        self.set_image(sprite_type, image_file_name, position, scale, anchor)
+
+    def set_image(self,
+                  sprite_type: str,
+                  image_file_name: str,
+                  position: tuple[int, int],
+                  scale: tuple[int | float, int | float] = (1, 1),
+                  anchor: str = "center") -> None:
+        """Shows the given image at the given position, so the sprite can be reused for another tile."""
         self.type = sprite_type
-        # image = pg.image.load(os.path.join(settings.DATA_DIR, image_file_name))
-        image = pg.image.load(image_file_name)
-        size = image.get_size()
-        new_size = (size[0] * scale[0], size[1] * scale[1])
-        self.image = pg.transform.scale(image, new_size)
+        self.image = assets.get_image(image_file_name, scale)
         match anchor:
             case "topleft":
                 self.rect = self.image.get_rect(topleft=position)
@@ -28,3 +37,86 @@ class TileSprite(pg.sprite.Sprite):
                 self.rect = self.image.get_rect(bottomright=position)
             case "center" | _:
                 self.rect = self.image.get_rect(center=position)
+        if not self.visible:
+            self.visible = 1
+        self.dirty = 1
+
+    def hide(self) -> None:
+        """Hides the sprite, LayeredDirty clears its area on the next draw."""
+        if self.visible:
+            self.visible = 0
+
+
+class SpriteRegistry:
+    """Tile sprites of a game by role: board marks by bitboard index and the turn indicator.
+
+    Sprites stay in the group once created and are hidden instead of removed, so looking up,
+    placing, replacing and removing a sprite take constant time on any board size. Hidden mark
+    sprites are reused for the next marks placed, also after a reset.
+    """
+
+    def __init__(self, group: pg.sprite.LayeredDirty) -> None:
+        self.group = group
+        self.marks: dict[int, TileSprite] = {}  # shown marks by bitboard index
+        self.spare_marks: list[TileSprite] = []  # hidden mark sprites ready for reuse
+        self.turn_indicator = None
+
+    def has_mark(self, index: int) -> bool:
+        """Checks if the grid slot at the given bitboard index has a mark."""
+        return index in self.marks
+
+    def get_mark(self, index: int) -> TileSprite | None:
+        """Returns the mark sprite in the grid slot at the given bitboard index."""
+        return self.marks.get(index)
+
+    def place_mark(self,
+                   index: int,
+                   sprite_type: str,
+                   image_file_name: str,
+                   position: tuple[int, int],
+                   scale: tuple[int | float, int | float] = (1, 1),
+                   anchor: str = "center") -> TileSprite:
+        """Shows a mark in the grid slot at the given bitboard index, replacing the mark already there."""
+        sprite = self.marks.get(index)
+        if sprite is None and self.spare_marks:
+            sprite = self.spare_marks.pop()
+        if sprite is None:
+            sprite = TileSprite(sprite_type, image_file_name, position, scale, anchor)
+            self.group.add(sprite)
+        else:
+            sprite.set_image(sprite_type, image_file_name, position, scale, anchor)
+        self.marks[index] = sprite
+        return sprite
+
+    def remove_mark(self, index: int) -> None:
+        """Hides the mark in the grid slot at the given bitboard index, if there is one."""
+        sprite = self.marks.pop(index, None)
+        if sprite is not None:
+            sprite.hide()
+            self.spare_marks.append(sprite)
+
+    def clear_marks(self) -> None:
+        """Hides every mark, keeping the sprites for reuse."""
+        for sprite in self.marks.values():
+            sprite.hide()
+        self.spare_marks.extend(self.marks.values())
+        self.marks.clear()
+
+    def show_turn_indicator(self,
+                            sprite_type: str,
+                            image_file_name: str,
+                            position: tuple[int, int],
+                            scale: tuple[int | float, int | float] = (1, 1),
+                            anchor: str = "center") -> TileSprite:
+        """Shows the turn indicator with the given image."""
+        if self.turn_indicator is None:
+            self.turn_indicator = TileSprite(sprite_type, image_file_name, position, scale, anchor)
+            self.group.add(self.turn_indicator)
+        else:
+            self.turn_indicator.set_image(sprite_type, image_file_name, position, scale, anchor)
+        return self.turn_indicator
+
+    def hide_turn_indicator(self) -> None:
+        """Hides the turn indicator."""
+        if self.turn_indicator is not None:
+            self.turn_indicator.hide()
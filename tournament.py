@@ -0,0 +1,196 @@
+"""Headless tournament that pits computer player strategies against each other on many cores.
+
+Every ordered pair of strategies plays '--games' games, split into shards that run in a
+ProcessPoolExecutor. Each shard seeds its players from the tournament seed and its shard id,
+so results don't depend on the number of workers or the order shards finish in. Finished
+shards are appended to a JSON lines results file together with their parameters as they come
+in, and rerunning with the same file skips the shards it already holds. A file played with other
+parameters is refused rather than mixed into the standings. Games are played on engine.Board, the same rules
+TicTacToe.add_turn and TicTacToe.get_winner use.
+
+Usage: python tournament.py --strategies random heuristic search --games 1000 --results results.jsonl
+"""
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import engine
+import settings
+from ai import AlphaBetaPlayer, HeuristicPlayer, RandomPlayer
+
+STRATEGIES = ("random", "heuristic", "search")
+ELO_K = 16
+ELO_START = 1500
+
+
+def create_player(strategy: str, sprite_type: str, seed: str, search_depth: int):
+    """Returns a computer player for the given strategy name."""
+    match strategy:
+        case "random":
+            return RandomPlayer(sprite_type, seed)
+        case "heuristic":
+            return HeuristicPlayer(sprite_type, seed)
+        case "search":
+            return AlphaBetaPlayer(sprite_type, max_depth=search_depth, time_budget=None)
+        case _:
+            raise ValueError(f"Unknown strategy: {strategy!r}.")
+
+
+def play_game(board: engine.Board, players: dict) -> str | None:
+    """Plays a game on the board until it is won or tied, returning the winner."""
+    board.reset()
+    while board.get_winner() is None and board.is_winnable():
+        sprite_type = board.get_turn()
+        board.play(sprite_type, players[sprite_type].choose_move(board))
+    return board.get_winner()
+
+
+def play_shard(shard: dict) -> dict:
+    """Plays the games of one shard, returning its results as one 'x', 'o' or '-' per game."""
+    seed = f"{shard['seed']}-{shard['id']}"
+    grid_division, win_length = shard["grid_division"], shard["win_length"]
+    board = engine.create_board(grid_division, win_length)
+    players = {
+        engine.CROSS: create_player(shard["cross"], engine.CROSS, f"{seed}-cross", shard["search_depth"]),
+        engine.CIRCLE: create_player(shard["circle"], engine.CIRCLE, f"{seed}-circle", shard["search_depth"]),
+    }
+    symbols = {engine.CROSS: "x", engine.CIRCLE: "o", None: "-"}
+    results = "".join(symbols[play_game(board, players)] for _ in range(shard["games"]))
+    return {**shard, "results": results}
+
+
+def get_shards(strategies: list[str],
+               games: int,
+               shard_size: int,
+               grid_division: int,
+               win_length: int,
+               seed: int,
+               search_depth: int) -> list[dict]:
+    """Splits the games of every ordered pair of strategies into shards."""
+    shards = []
+    for cross, circle in itertools.permutations(strategies, 2):
+        for start in range(0, games, shard_size):
+            shards.append({
+                "id": len(shards),
+                "cross": cross,
+                "circle": circle,
+                "games": min(shard_size, games - start),
+                "grid_division": grid_division,
+                "win_length": win_length,
+                "seed": seed,
+                "search_depth": search_depth,
+            })
+    return shards
+
+
+def load_results(results_path: str) -> dict[int, dict]:
+    """Returns the finished shards stored in the results file by shard id."""
+    finished = {}
+    if not os.path.exists(results_path):
+        return finished
+    with open(results_path) as results_file:
+        for line in results_file:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:  # partially written line from an interrupted run
+                continue
+            finished[result["id"]] = result
+    return finished
+
+
+def run_shards(shards: list[dict], results_path: str, workers: int | None) -> dict[int, dict]:
+    """Plays every shard that isn't in the results file yet, appending results as they finish.
+
+    Raises ValueError if a stored shard was played with other parameters than the same shard now.
+    """
+    stored = load_results(results_path)
+    finished = {}
+    for shard in shards:
+        result = stored.get(shard["id"])
+        if result is None:
+            continue
+        mismatched = [key for key, value in shard.items() if result.get(key) != value]
+        if mismatched:
+            raise ValueError(f"Shard {shard['id']} in {results_path} was played with other parameters "
+                             f"({', '.join(mismatched)}), use another results file.")
+        finished[shard["id"]] = result
+    pending = [shard for shard in shards if shard["id"] not in finished]
+    print(f"{len(finished)} shards already finished, playing {len(pending)}.")
+    with open(results_path, "a") as results_file, ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_shard, shard) for shard in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
+            finished[result["id"]] = result
+            print(f"\r{done}/{len(pending)} shards", end="", flush=True)
+    print()
+    return finished
+
+
+def get_standings(results: list[dict], strategies: list[str]) -> dict:
+    """Returns win/tie/loss counts for every pair of strategies and Elo ratings for every strategy."""
+    pairs = {f"{cross} vs {circle}": {"cross_wins": 0, "circle_wins": 0, "ties": 0}
+             for cross, circle in itertools.permutations(strategies, 2)}
+    ratings = {strategy: float(ELO_START) for strategy in strategies}
+    for result in sorted(results, key=lambda result: result["id"]):  # same order every run
+        cross, circle = result["cross"], result["circle"]
+        pair = pairs[f"{cross} vs {circle}"]
+        for symbol in result["results"]:
+            match symbol:
+                case "x":
+                    pair["cross_wins"] += 1
+                    score = 1
+                case "o":
+                    pair["circle_wins"] += 1
+                    score = 0
+                case _:
+                    pair["ties"] += 1
+                    score = 0.5
+            expected = 1 / (1 + 10 ** ((ratings[circle] - ratings[cross]) / 400))
+            ratings[cross] += ELO_K * (score - expected)
+            ratings[circle] -= ELO_K * (score - expected)
+
+    scores = {strategy: {"games": 0, "wins": 0, "ties": 0, "losses": 0} for strategy in strategies}
+    for name, pair in pairs.items():
+        cross, circle = name.split(" vs ")
+        games = pair["cross_wins"] + pair["circle_wins"] + pair["ties"]
+        for strategy, wins, losses in ((cross, pair["cross_wins"], pair["circle_wins"]),
+                                       (circle, pair["circle_wins"], pair["cross_wins"])):
+            scores[strategy]["games"] += games
+            scores[strategy]["wins"] += wins
+            scores[strategy]["losses"] += losses
+            scores[strategy]["ties"] += pair["ties"]
+    for strategy, score in scores.items():
+        score["win_rate"] = round(score["wins"] / score["games"], 4) if score["games"] else None
+        score["elo"] = round(ratings[strategy])
+    return {"pairs": pairs, "strategies": scores}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pit Tic Tac Toe player strategies against each other.")
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES))
+    parser.add_argument("--games", type=int, default=1000, help="games per ordered pair of strategies")
+    parser.add_argument("--shard-size", type=int, default=100)
+    parser.add_argument("--grid-division", type=int, default=settings.GRID_DIVISION)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--search-depth", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the number of cores")
+    parser.add_argument("--results", default="tournament_results.jsonl")
+    args = parser.parse_args()
+
+    win_length = engine.get_win_length(args.grid_division, args.win_length)
+    shards = get_shards(args.strategies, args.games, args.shard_size, args.grid_division, win_length, args.seed,
+                        args.search_depth)
+    try:
+        results = run_shards(shards, args.results, args.workers)
+    except ValueError as error:
+        parser.error(str(error))
+    print(json.dumps(get_standings(list(results.values()), args.strategies), indent=2))
+
+
+if __name__ == "__main__":
+    main()
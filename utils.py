@@ -1,5 +1,7 @@
 import pygame as pg
 
+import assets
+import fonts
 import settings
 
 
@@ -7,16 +9,41 @@ def section_of_number(number: int,
                       total_width: int | float,
                       no_sections: int) -> int | None:
     """Returns whichever integer section a number is between for a total window width."""
-    for i in range(no_sections):
-        section_width = total_width / no_sections
-        if (section_width * i) < number <= (section_width * (i + 1)):
-            return i + 1
+    if not 0 < number <= total_width:
+        return None
+    return int(-(-number * no_sections // total_width))  # ceil division
+
+
+def get_grid_background(board_width: int, grid_division: int) -> pg.Surface:
+    """Returns the grid background for a board of the given width, drawing the grid lines when it is not 3x3."""
+    if grid_division == 3:
+        scale = board_width / settings.SCREEN_WIDTH  # the background image is drawn for the window width
+        return assets.get_image(settings.BACKGROUND_IMAGE, (scale, scale))
+    background_image = pg.Surface((board_width, board_width), pg.SRCALPHA)
+    slot_size = board_width / grid_division
+    for i in range(1, grid_division):
+        offset = round(i * slot_size)
+        pg.draw.line(background_image, settings.GRID_LINE_COLOR, (offset, 0), (offset, board_width),
+                     settings.GRID_LINE_WIDTH)
+        pg.draw.line(background_image, settings.GRID_LINE_COLOR, (0, offset), (board_width, offset),
+                     settings.GRID_LINE_WIDTH)
+    return background_image
+
+
+def is_on_reset_button(position: tuple[int, int]) -> bool:
+    """Checks if the given position is within the reset button."""
+    reset_left_position = settings.RESET_TEXT_POSITION[0]
+    reset_right_position = reset_left_position + settings.RESET_BUTTON_SIZE[0]
+    reset_top_position = settings.RESET_TEXT_POSITION[1]
+    reset_bottom_position = reset_top_position + settings.RESET_BUTTON_SIZE[1]
+    return reset_left_position <= position[0] <= reset_right_position and \
+        reset_top_position <= position[1] <= reset_bottom_position
 
 
 def get_turn_text_objects(text: str) -> tuple[pg.Surface, pg.Rect]:
     """Returns pg.Surface and pg.Rect for the given text positioned at the bottom of the window."""
-    font = pg.font.SysFont(settings.FONT, settings.FONT_SIZE)
-    text_surface = font.render(text, True, settings.FONT_COLOR, settings.FONT_BG_COLOR)
+    text_surface = fonts.get_text_surface(settings.FONT, settings.FONT_SIZE, text,
+                                          settings.FONT_COLOR, settings.FONT_BG_COLOR)
     text_rect = text_surface.get_rect(topleft=settings.TEXT_POSITION)
     return text_surface, text_rect
 
@@ -28,24 +55,24 @@ def get_winner_text_objects(winner_string: str) -> tuple[pg.Surface, pg.Rect]:
             winner_font_color = "blue"
         case "cross" | _:
             winner_font_color = "red"
-    winner_font = pg.font.SysFont(settings.FONT, settings.FONT_SIZE)
-    text_surface = winner_font.render(f"{winner_string.capitalize()} wins!".ljust(settings.TEXT_WIDTH),
-                                      True, winner_font_color)
+    text_surface = fonts.get_text_surface(settings.FONT, settings.FONT_SIZE,
+                                          f"{winner_string.capitalize()} wins!".ljust(settings.TEXT_WIDTH),
+                                          winner_font_color)
     text_rect = text_surface.get_rect(topleft=settings.TEXT_POSITION)
     return text_surface, text_rect
 
 
 def get_tie_text_objects() -> tuple[pg.Surface, pg.Rect]:
     """Returns pg.Surface and pg.Rect for the bottom text for when there is no more legal moves."""
-    game_over_font = pg.font.SysFont(settings.FONT, settings.FONT_SIZE)
-    text_surface = game_over_font.render("Tie!".center(settings.TEXT_WIDTH), True, settings.GAME_OVER_FONT_COLOR)
+    text_surface = fonts.get_text_surface(settings.FONT, settings.FONT_SIZE, "Tie!".center(settings.TEXT_WIDTH),
+                                          settings.GAME_OVER_FONT_COLOR)
     text_rect = text_surface.get_rect(topleft=settings.TEXT_POSITION)
     return text_surface, text_rect
 
 
 def get_reset_text_objects() -> tuple[pg.Surface, pg.Rect]:
     """Returns pg.Surface and pg.Rect for the reset button text."""
-    reset_font = pg.font.SysFont(settings.RESET_FONT, settings.RESET_FONT_SIZE)
-    text_surface = reset_font.render("RESET", True, settings.RESET_FONT_COLOR)
+    text_surface = fonts.get_text_surface(settings.RESET_FONT, settings.RESET_FONT_SIZE, "RESET",
+                                          settings.RESET_FONT_COLOR)
     text_rect = text_surface.get_rect(center=settings.RESET_TEXT_POSITION)
     return text_surface, text_rect
@@ -0,0 +1,63 @@
+import pygame as pg
+
+import settings
+import utils
+
+
+class TextSprite(pg.sprite.DirtySprite):
+    """Dirty sprite for the bottom text, only redrawn when its text objects change."""
+
+    def __init__(self, text_surface: pg.Surface, text_rect: pg.Rect):
+        pg.sprite.DirtySprite.__init__(self)
+        self.image = text_surface
+        self.rect = text_rect
+
+    def set_text_objects(self, text_surface: pg.Surface, text_rect: pg.Rect) -> None:
+        """Replaces the shown text, marking the sprite dirty if it changed."""
+        if text_surface is self.image and text_rect == self.rect:
+            return
+        self.image = text_surface
+        self.rect = text_rect
+        self.dirty = 1
+
+
+class ResetButtonSprite(pg.sprite.DirtySprite):
+    """Dirty sprite for the reset button, only redrawn when it is shown, hidden or hovered."""
+
+    def __init__(self):
+        pg.sprite.DirtySprite.__init__(self)
+        button_rect = pg.Rect(settings.RESET_BUTTON_POSITION)
+        text_surface, _ = utils.get_reset_text_objects()
+        text_rect = text_surface.get_rect(topleft=settings.RESET_TEXT_POSITION)
+        self.rect = button_rect.union(text_rect)
+        self.images = {
+            False: self.render(settings.RESET_BUTTON_BG_COLOR, button_rect, text_surface, text_rect),
+            True: self.render(settings.RESET_BUTTON_BG_COLOR_LIGHTER, button_rect, text_surface, text_rect),
+        }
+        self.hovered = False
+        self.image = self.images[self.hovered]
+        self.visible = 0
+
+    def render(self,
+               color: str,
+               button_rect: pg.Rect,
+               text_surface: pg.Surface,
+               text_rect: pg.Rect) -> pg.Surface:
+        """Returns the button image with the given background color."""
+        image = pg.Surface(self.rect.size, pg.SRCALPHA)
+        pg.draw.rect(image, color, button_rect.move(-self.rect.x, -self.rect.y))
+        image.blit(text_surface, text_rect.move(-self.rect.x, -self.rect.y))
+        return image
+
+    def set_shown(self, shown: bool) -> None:
+        """Shows or hides the button, marking the sprite dirty if it changed."""
+        if shown != bool(self.visible):
+            self.visible = int(shown)
+
+    def set_hovered(self, hovered: bool) -> None:
+        """Switches to the lighter button color while the mouse is hovering over it."""
+        if hovered == self.hovered:
+            return
+        self.hovered = hovered
+        self.image = self.images[hovered]
+        self.dirty = 1